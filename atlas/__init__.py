@@ -0,0 +1 @@
+"""Local tooling for the Global Economic Atlas dashboard."""
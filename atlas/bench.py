@@ -0,0 +1,210 @@
+"""Per-widget latency benchmarks against a fixed local snapshot.
+
+Every Snowflake data source in the dashboard is timed on the DuckDB stand-in:
+cold runs execute it once on a fresh connection, warm runs repeat it on a
+connection that has already prepared it. Selection-driven widgets cycle through
+`SAMPLE_COUNTRIES` as the selected overview row. The p50 of each is compared
+with `benchmarks/baselines.json`, and any that regresses past the tolerance
+fails the run. The p95 is reported next to its baseline but does not gate: a
+tail of 20 cold samples moves with scheduler noise by more than the floor.
+
+Without `--snapshot`, the synthetic snapshot from `atlas.fixtures` is generated
+with the seed and size recorded in the baselines.
+
+Usage:
+    python -m atlas.bench [--record] [--tolerance 0.5]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Any
+
+from atlas import fixtures
+from atlas import spec
+from atlas.warehouse import LocalSnowflake
+from atlas.warehouse import write_snapshot
+
+BASELINES = Path(__file__).resolve().parent.parent / "benchmarks" / "baselines.json"
+
+SAMPLE_COUNTRIES = (
+    "United States",
+    "Brazil",
+    "India",
+    "Nigeria",
+    "Germany",
+    "Egypt, Arab Rep.",
+)
+
+
+@dataclass
+class Timing:
+    """Latency samples of one widget in one phase, in milliseconds."""
+
+    samples: list[float] = field(default_factory=list)
+
+    @property
+    def p50(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def p95(self) -> float:
+        if len(self.samples) < 2:
+            return self.samples[0]
+        return statistics.quantiles(self.samples, n=20, method="inclusive")[18]
+
+    @property
+    def p99(self) -> float:
+        if len(self.samples) < 2:
+            return self.samples[0]
+        return statistics.quantiles(self.samples, n=100, method="inclusive")[98]
+
+
+def run(snapshot: Path, *, cold_runs: int, warm_runs: int) -> dict[str, Timing]:
+    """Time every Snowflake data source, keyed by `<widget>/<cold|warm>`."""
+    sources = [source for source in spec.load() if source.kind == "snowflake"]
+    timings: dict[str, Timing] = {}
+    for run_index in range(cold_runs):
+        with LocalSnowflake(snapshot) as warehouse:
+            selections = _sample_selections(warehouse, sources)
+            for source in sources:
+                selection = selections[run_index % len(selections)]
+                timing = timings.setdefault(f"{source.widget_id}/cold", Timing())
+                timing.samples.append(_time(warehouse, source, selection))
+
+    with LocalSnowflake(snapshot) as warehouse:
+        selections = _sample_selections(warehouse, sources)
+        for source in sources:
+            warehouse.execute(source.template, selections[0])
+            timing = timings.setdefault(f"{source.widget_id}/warm", Timing())
+            for run_index in range(warm_runs):
+                selection = selections[run_index % len(selections)]
+                timing.samples.append(_time(warehouse, source, selection))
+    return timings
+
+
+def _time(
+    warehouse: LocalSnowflake,
+    source: spec.DataSource,
+    selection: dict[str, dict[str, Any]],
+) -> float:
+    start = time.perf_counter()
+    warehouse.execute(source.template, selection)
+    return (time.perf_counter() - start) * 1000
+
+
+def _sample_selections(
+    warehouse: LocalSnowflake, sources: list[spec.DataSource]
+) -> list[dict[str, dict[str, Any]]]:
+    """One selection per sample country, for every widget others link to.
+
+    Widgets without countries, such as the year selector, keep the row the
+    dashboard opens with.
+    """
+    linked = {widget_id for source in sources for widget_id in source.selections}
+    selections: list[dict[str, dict[str, Any]]] = [{} for _ in SAMPLE_COUNTRIES]
+    for source in sources:
+        if source.widget_id not in linked:
+            continue
+        for selection, country in zip(selections, SAMPLE_COUNTRIES):
+            rows = warehouse.execute(source.template, selection)
+            if rows and "COUNTRY_NAME" not in rows[0]:
+                selection[source.widget_id] = rows[0]
+                continue
+            by_country = {row["COUNTRY_NAME"]: row for row in rows}
+            if country not in by_country:
+                msg = f"Sample country {country!r} is not in {source.widget_id}."
+                raise LookupError(msg)
+            selection[source.widget_id] = by_country[country]
+    return selections
+
+
+def regressions(
+    timings: dict[str, Timing],
+    baselines: dict[str, dict[str, float]],
+    *,
+    tolerance: float,
+    floor_ms: float,
+) -> list[str]:
+    """Describe every p50 slower than its baseline beyond tolerance.
+
+    A regression must exceed both the relative `tolerance` and `floor_ms`, so
+    sub-millisecond jitter on fast widgets does not fail the run.
+    """
+    found = []
+    for key, timing in timings.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        now, before = timing.p50, baseline["p50_ms"]
+        if now > before * (1 + tolerance) and now - before > floor_ms:
+            found.append(f"{key} p50 {now:.2f} ms (baseline {before:.2f} ms)")
+    return found
+
+
+def report(timings: dict[str, Timing], baselines: dict[str, dict[str, float]]) -> str:
+    """Format timings next to their baselines."""
+    lines = [f"{'benchmark':<32} {'p50':>8} {'p95':>8} {'base p50':>9} {'base p95':>9}"]
+    for key, timing in timings.items():
+        baseline = baselines.get(key, {})
+        lines.append(
+            f"{key:<32} {timing.p50:>8.2f} {timing.p95:>8.2f} "
+            f"{baseline.get('p50_ms', float('nan')):>9.2f} "
+            f"{baseline.get('p95_ms', float('nan')):>9.2f}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks and compare them with the recorded baselines."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.bench")
+    parser.add_argument("--snapshot", type=Path, help="default: synthetic fixture")
+    parser.add_argument("--baselines", type=Path, default=BASELINES)
+    parser.add_argument("--cold-runs", type=int, default=20)
+    parser.add_argument("--warm-runs", type=int, default=40)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--floor-ms", type=float, default=1.0)
+    parser.add_argument("--record", action="store_true", help="overwrite baselines")
+    args = parser.parse_args(argv)
+
+    recorded = json.loads(args.baselines.read_text()) if args.baselines.exists() else {}
+    fixture = recorded.get("fixture", {"economies": 217, "seed": 2020})
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = args.snapshot
+        if snapshot is None:
+            snapshot = Path(directory)
+            write_snapshot(
+                snapshot, fixtures.snapshot(fixture["economies"], fixture["seed"])
+            )
+        timings = run(snapshot, cold_runs=args.cold_runs, warm_runs=args.warm_runs)
+
+    baselines = recorded.get("benchmarks", {})
+    sys.stdout.write(report(timings, baselines))
+    if args.record:
+        recorded = {
+            "fixture": fixture,
+            "benchmarks": {
+                key: {"p50_ms": round(timing.p50, 3), "p95_ms": round(timing.p95, 3)}
+                for key, timing in timings.items()
+            },
+        }
+        args.baselines.parent.mkdir(parents=True, exist_ok=True)
+        args.baselines.write_text(json.dumps(recorded, indent=2) + "\n")
+        return 0
+
+    found = regressions(
+        timings, baselines, tolerance=args.tolerance, floor_ms=args.floor_ms
+    )
+    for regression in found:
+        sys.stderr.write(f"REGRESSION: {regression}\n")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
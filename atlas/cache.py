@@ -0,0 +1,212 @@
+"""Tiered cache of connector results shared by every data source.
+
+Results are kept in an in-memory LRU in front of an optional on-disk store of
+one JSON file per entry, so a new process starts warm. Entries are keyed by
+connector slug, query template with its whitespace normalized, and the bound
+parameters.
+
+An entry is stored with the freshness token of the data it was read from,
+which a miss takes from the request itself, so filling the cache costs one
+request. An entry younger than the TTL is served as is. An older entry is still
+served, and a background refresh first compares the source's current
+freshness token with the stored one, such as the World Bank API's
+`lastupdated` date or the warehouse table version: an unchanged token only
+renews the entry, a changed one re-runs the request. Sources change a few
+times a year, so most reads cost no warehouse or API call at all.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from atlas import tracing
+
+DEFAULT_TTL = 6 * 60 * 60
+
+DEFAULT_CAPACITY = 256
+
+Rows = list[dict[str, Any]]
+
+_WHITESPACE = re.compile(r"('(?:[^']|'')*')|\s+")
+
+
+@dataclass
+class Entry:
+    """One cached result."""
+
+    rows: Rows
+    token: str | None
+    stored_at: float
+
+
+def cache_key(slug: str, query: str, parameters: list[Any]) -> str:
+    """Key of a request, the same for queries differing only in whitespace."""
+    normalized = _WHITESPACE.sub(lambda match: match.group(1) or " ", query).strip()
+    payload = json.dumps([slug, normalized, parameters], default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """In-memory LRU over an optional on-disk store, with stale-while-revalidate."""
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        *,
+        capacity: int = DEFAULT_CAPACITY,
+        ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Constructor for ResultCache class.
+
+        Args:
+            directory: on-disk store, None to keep entries in memory only.
+            capacity: entries kept in memory.
+            ttl: seconds an entry is served without revalidation.
+            clock: current time in seconds.
+        """
+        self.directory = None if directory is None else Path(directory)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.failed_refreshes = 0
+        self.__entries: OrderedDict[str, Entry] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__refreshing: dict[str, Future[None]] = {}
+        self.__executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="cache-refresh"
+        )
+
+    def get(
+        self,
+        key: str,
+        fetch: Callable[[], tuple[Rows, str | None]],
+        freshness: Callable[[], str | None] | None = None,
+    ) -> Rows:
+        """Cached rows of a request, fetched on a miss.
+
+        Args:
+            key: request key, see `cache_key`.
+            fetch: runs the request, returning its rows and the freshness
+                token of the data they were read from, None if unknown.
+            freshness: token that changes whenever the source's data changes,
+                only read to revalidate a stale entry.
+        """
+        entry = self.__lookup(key)
+        if entry is None:
+            self.misses += 1
+            tracing.annotate(cache="miss")
+            rows, token = fetch()
+            self.__store(key, Entry(rows, token, self.clock()))
+            return rows
+        if self.clock() - entry.stored_at < self.ttl:
+            self.hits += 1
+            tracing.annotate(cache="hit")
+            return entry.rows
+        self.stale_hits += 1
+        tracing.annotate(cache="stale")
+        with self.__lock:
+            if key not in self.__refreshing:
+                self.__refreshing[key] = self.__executor.submit(
+                    self.__refresh, key, entry, fetch, freshness
+                )
+        return entry.rows
+
+    def invalidate(self, key: str, token: str | None = None) -> None:
+        """Drop the entry of `key`, unless it was stored under freshness `token`.
+
+        Several readers told of the same change drop the entry only once:
+        the first one to fetch again stores it under the new token.
+        """
+        entry = self.__lookup(key)
+        if entry is None or (token is not None and entry.token == token):
+            return
+        with self.__lock:
+            self.__entries.pop(key, None)
+        path = self.__path(key)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def wait(self) -> None:
+        """Wait for the background refreshes started so far."""
+        with self.__lock:
+            pending = list(self.__refreshing.values())
+        wait(pending)
+
+    def close(self) -> None:
+        """Finish the background refreshes and stop their worker threads."""
+        self.__executor.shutdown(wait=True)
+
+    def __refresh(
+        self,
+        key: str,
+        entry: Entry,
+        fetch: Callable[[], tuple[Rows, str | None]],
+        freshness: Callable[[], str | None] | None,
+    ) -> None:
+        try:
+            token = freshness() if freshness is not None else None
+            rows = entry.rows
+            if token is None or token != entry.token:
+                rows, fetched = fetch()
+                token = fetched if fetched is not None else token
+            self.__store(key, Entry(rows, token, self.clock()))
+        except Exception:  # noqa: BLE001
+            # The stale entry stays; the next read schedules another refresh.
+            self.failed_refreshes += 1
+        finally:
+            with self.__lock:
+                del self.__refreshing[key]
+
+    def __lookup(self, key: str) -> Entry | None:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                return entry
+        path = self.__path(key)
+        if path is None or not path.exists():
+            return None
+        entry = Entry(**json.loads(path.read_text()))
+        self.__remember(key, entry)
+        return entry
+
+    def __store(self, key: str, entry: Entry) -> None:
+        self.__remember(key, entry)
+        path = self.__path(key)
+        if path is not None:
+            # A refresh and a miss may store the same key at once, so each
+            # write goes to its own file before it replaces the entry.
+            with tempfile.NamedTemporaryFile(
+                "w", dir=path.parent, prefix=f"{key}.", suffix=".partial", delete=False
+            ) as partial:
+                partial.write(json.dumps(asdict(entry), default=str))
+            os.replace(partial.name, path)
+
+    def __remember(self, key: str, entry: Entry) -> None:
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.capacity:
+                self.__entries.popitem(last=False)
+
+    def __path(self, key: str) -> Path | None:
+        return None if self.directory is None else self.directory / f"{key}.json"
@@ -0,0 +1,381 @@
+"""Change feed on `WORLD_BANK_INDICATORS` and the widgets a change touches.
+
+A change is summarized as the indicators and years that received rows. The
+local stand-in reports every `LocalSnowflake.append` (`LocalChangeFeed`); on
+Snowflake an append-only stream on the table is polled (`SnowflakeChangeFeed`,
+created by the DDL `python -m atlas.changes --ddl` prints).
+
+`footprint` reads from a widget query which indicators and years it can see:
+indicator ids quoted in it, indicator columns of `WORLD_BANK_COUNTRY_YEAR` it
+names, the compared indicators when it reads `WORLD_BANK_COUNTRY_VS_REGION`,
+and the years of its `YEAR = <year>` conditions, where a link to the year
+selector counts as the selected year. A query naming no indicator, or no year,
+sees them all. Each timeseries point only depends on its own year, so a
+timeseries widget fetches just the changed years (`delta_query`) and `merge`s
+them into the rows it has.
+
+Usage:
+    python -m atlas.changes SNAPSHOT_DIR [--indicator ID] [--year 2024]
+    python -m atlas.changes --ddl
+"""
+
+import argparse
+import asyncio
+import calendar
+import contextlib
+import logging
+import re
+import sys
+import threading
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from typing import Protocol
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from atlas import spec
+from atlas.models import COMPARED_INDICATORS
+from atlas.models import COUNTRY_VS_REGION
+from atlas.models import INDICATORS
+from atlas.params import YEAR_SELECTOR
+from atlas.params import AtlasParams
+from atlas.warehouse import LocalSnowflake
+from atlas.warehouse import Selection
+from atlas.warehouse import snowflake_connection
+
+TABLE = "WORLD_BANK_INDICATORS"
+
+STREAM = f"{TABLE}_CHANGES"
+
+# Audit trail of the changes read from the stream; inserting into it is the
+# DML that moves the stream's offset past them.
+CHANGE_LOG = f"{TABLE}_CHANGE_LOG"
+
+logger = logging.getLogger(__name__)
+
+Rows = list[dict[str, Any]]
+
+_QUOTED = re.compile(r"'(?:[^']|'')*'")
+_YEAR = re.compile(r"\bYEAR\s*=\s*(\d{4})\b", re.IGNORECASE)
+_COLUMNS = {
+    indicator: re.compile(rf"\b{column}\b", re.IGNORECASE)
+    for column, indicator in INDICATORS.items()
+}
+
+
+@dataclass(frozen=True)
+class Change:
+    """Rows landed in a base table; None stands for everything."""
+
+    table: str
+    indicators: frozenset[str] | None = None
+    years: frozenset[int] | None = None
+
+    @classmethod
+    def of(cls, table: str, rows: pa.Table) -> "Change":
+        """The change made by appending `rows` to `table`."""
+        if table != TABLE:
+            return cls(table)
+        return cls(
+            table,
+            frozenset(rows.column("INDICATOR_ID").to_pylist()),
+            frozenset(rows.column("YEAR").to_pylist()),
+        )
+
+
+@dataclass(frozen=True)
+class Footprint:
+    """Indicators and years a widget query reads; None stands for all."""
+
+    indicators: frozenset[str] | None
+    years: frozenset[int] | None
+
+    def touches(self, change: Change) -> bool:
+        """Whether the query's result can differ after `change`."""
+        return all(
+            mine is None or theirs is None or bool(mine & theirs)
+            for mine, theirs in (
+                (self.indicators, change.indicators),
+                (self.years, change.years),
+            )
+        )
+
+
+def footprint(query: str, selection: Selection | None = None) -> Footprint:
+    """Indicators and years a widget query reads.
+
+    Args:
+        query: widget query template.
+        selection: selected row per widget id; numbers selected for the
+            query's links, such as the year, count as written in the query.
+    """
+    if selection:
+        query = spec.TEMPLATE_LINK.sub(lambda link: _bound(link, selection), query)
+    unquoted = _QUOTED.sub("''", query)
+    indicators = {literal[1:-1] for literal in _QUOTED.findall(query)} & set(
+        INDICATORS.values()
+    )
+    indicators |= {
+        indicator for indicator, column in _COLUMNS.items() if column.search(unquoted)
+    }
+    if re.search(rf"\b{COUNTRY_VS_REGION.name}\b", unquoted, re.IGNORECASE):
+        indicators |= set(COMPARED_INDICATORS)
+    years = {int(year) for year in _YEAR.findall(unquoted)}
+    return Footprint(frozenset(indicators) or None, frozenset(years) or None)
+
+
+def _bound(link: re.Match[str], selection: Selection) -> str:
+    value = selection.get(link.group(1), {}).get(link.group(2))
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return link.group(0)
+
+
+def delta_query(query: str, years: Iterable[int]) -> str:
+    """A timeseries query limited to the points of `years`."""
+    dates = ", ".join(str(epoch_ms(year)) for year in sorted(years))
+    return (
+        f"SELECT * FROM (\n{query.strip()}\n) AS delta\n"
+        f"WHERE delta.DATE IN ({dates})\nORDER BY delta.DATE"
+    )
+
+
+def epoch_ms(year: int) -> int:
+    """The `DATE` of a year's timeseries point, as in `WORLD_BANK_YEAR_DIM`."""
+    return calendar.timegm((year, 1, 1, 0, 0, 0)) * 1000
+
+
+def merge(rows: Rows, delta: Rows, key: str = "DATE") -> Rows:
+    """Timeseries `rows` with the points of `delta` replaced or added."""
+    points = {row[key]: row for row in rows}
+    points.update((row[key], row) for row in delta)
+    return sorted(points.values(), key=lambda row: row[key])
+
+
+class ChangeFeed(Protocol):
+    """Reports the changes of the warehouse tables."""
+
+    def subscribe(self, callback: Callable[[Change], None]) -> Callable[[], None]:
+        """Call `callback` with every change; return a function cancelling it."""
+
+
+class LocalChangeFeed:
+    """Changes made by `LocalSnowflake.append`."""
+
+    def __init__(self, warehouse: LocalSnowflake) -> None:
+        self.warehouse = warehouse
+
+    def subscribe(self, callback: Callable[[Change], None]) -> Callable[[], None]:
+        return self.warehouse.subscribe(
+            lambda table, rows: callback(Change.of(table, rows))
+        )
+
+
+class SnowflakeChangeFeed:
+    """Changes read from the append-only stream on the live table.
+
+    A daemon thread polls the stream every `interval` seconds while anyone is
+    subscribed: it stops within `interval` of the last subscriber cancelling,
+    so no poll commits stream offsets nobody reads, and the next subscriber
+    starts another one. A failed poll or subscriber is logged and counted in
+    `failed_polls` or `failed_callbacks`, and polling goes on. Configured like
+    `atlas.warehouse.snowflake_connection`.
+    """
+
+    def __init__(self, *, interval: float = 60.0) -> None:
+        self.interval = interval
+        self.connection = snowflake_connection()
+        self.failed_polls = 0
+        self.failed_callbacks = 0
+        self.__subscribers: list[Callable[[Change], None]] = []
+        self.__lock = threading.Lock()
+        self.__stopped = threading.Event()
+        self.__thread: threading.Thread | None = None
+
+    def subscribe(self, callback: Callable[[Change], None]) -> Callable[[], None]:
+        with self.__lock:
+            self.__subscribers.append(callback)
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__poll_forever, daemon=True
+                )
+                self.__thread.start()
+
+        def cancel() -> None:
+            with self.__lock:
+                self.__subscribers.remove(callback)
+
+        return cancel
+
+    def close(self) -> None:
+        """Stop polling and close the connection."""
+        self.__stopped.set()
+        with self.__lock:
+            thread = self.__thread
+        if thread is not None:
+            thread.join()
+        self.connection.close()
+
+    def poll(self) -> Change | None:
+        """The change landed since the last poll, None when there is none."""
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN")
+        try:
+            # Within the transaction both statements see the same stream rows.
+            cursor.execute(f"SELECT DISTINCT INDICATOR_ID, YEAR FROM {STREAM}")
+            rows = cursor.fetchall()
+            cursor.execute(
+                f"INSERT INTO {CHANGE_LOG} (INDICATOR_ID, YEAR) "
+                f"SELECT DISTINCT INDICATOR_ID, YEAR FROM {STREAM}"
+            )
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+        if not rows:
+            return None
+        return Change(
+            TABLE,
+            frozenset(indicator for indicator, _ in rows),
+            frozenset(int(year) for _, year in rows),
+        )
+
+    def __reconnect(self) -> None:
+        with contextlib.suppress(Exception):
+            self.connection.close()
+        try:
+            self.connection = snowflake_connection()
+        except Exception:
+            logger.exception("Reconnecting to poll %s failed", STREAM)
+
+    def __poll_forever(self) -> None:
+        while not self.__stopped.wait(self.interval):
+            with self.__lock:
+                if not self.__subscribers:
+                    # Decided under the lock, so a new subscriber starts a
+                    # new thread only once this one no longer polls.
+                    self.__thread = None
+                    return
+            try:
+                change = self.poll()
+            except Exception:
+                # The stream keeps the rows until a poll commits, so the next
+                # one reads them, on a new connection in case this one's
+                # session is gone.
+                self.failed_polls += 1
+                logger.exception("Polling %s failed", STREAM)
+                self.__reconnect()
+                continue
+            if change is None:
+                continue
+            with self.__lock:
+                subscribers = list(self.__subscribers)
+            for callback in subscribers:
+                try:
+                    callback(change)
+                except Exception:
+                    self.failed_callbacks += 1
+                    logger.exception("A subscriber of %s failed", STREAM)
+
+
+def ddl() -> str:
+    """DDL creating the stream and change log `SnowflakeChangeFeed` reads."""
+    return (
+        f"CREATE STREAM IF NOT EXISTS {STREAM}\n"
+        f"    ON TABLE {TABLE}\n"
+        "    APPEND_ONLY = TRUE;\n\n"
+        f"CREATE TABLE IF NOT EXISTS {CHANGE_LOG} (\n"
+        "    INDICATOR_ID VARCHAR,\n"
+        "    YEAR NUMBER,\n"
+        "    SEEN_AT TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP()\n"
+        ");\n"
+    )
+
+
+def sample_rows(warehouse: LocalSnowflake, indicator: str, year: int) -> pa.Table:
+    """Rows of `indicator` for `year`, 1% above each country's latest value."""
+    table = warehouse.tables[TABLE]
+    rows = table.filter(
+        pc.and_(
+            pc.equal(table["INDICATOR_ID"], indicator),
+            pc.less(table["YEAR"], year),
+        )
+    )
+    latest = {}
+    for row in rows.to_pylist():
+        if row["YEAR"] >= latest.get(row["COUNTRY_CODE"], {"YEAR": -1})["YEAR"]:
+            latest[row["COUNTRY_CODE"]] = row
+    return pa.Table.from_pylist(
+        [
+            {**row, "YEAR": year, "VALUE": row["VALUE"] * 1.01}
+            for row in latest.values()
+            if row["VALUE"] is not None
+        ],
+        schema=table.schema,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Append sample rows during a visit and print what each widget receives."""
+    from atlas.runtime import Session
+    from atlas.runtime import WarehouseFetcher
+
+    parser = argparse.ArgumentParser(prog="python -m atlas.changes")
+    parser.add_argument("snapshot", type=Path, nargs="?")
+    parser.add_argument("--indicator", default=INDICATORS["CO2_EMISSIONS"])
+    parser.add_argument("--year", type=int, default=2020)
+    parser.add_argument("--ddl", action="store_true", help="print Snowflake DDL")
+    args = parser.parse_args(argv)
+
+    if args.ddl:
+        sys.stdout.write(ddl())
+        return 0
+    if args.snapshot is None:
+        parser.error("a snapshot directory is needed unless --ddl is given")
+
+    # The year the dashboard opens with, for the widgets reading the selector.
+    opening = {YEAR_SELECTOR: {"YEAR": AtlasParams().year}}
+    for source in spec.load():
+        if source.kind == "snowflake":
+            touched = footprint(source.template, opening)
+            sys.stdout.write(
+                f"{source.widget_id:<25} "
+                f"{', '.join(sorted(touched.indicators or ['all indicators']))}; "
+                f"{', '.join(map(str, sorted(touched.years or ['all years'])))}\n"
+            )
+
+    with LocalSnowflake(args.snapshot) as warehouse:
+        fetcher = WarehouseFetcher(warehouse)
+
+        async def visit() -> None:
+            session = Session({"snowflake": fetcher})
+            await session.show(session.tabs[0])
+            await session.wait()
+            pushed: asyncio.Queue[list[Any]] = asyncio.Queue()
+            session.watch(LocalChangeFeed(warehouse), pushed.put_nowait)
+            rows = sample_rows(warehouse, args.indicator, args.year)
+            with fetcher.lock:
+                warehouse.append(TABLE, rows)
+            updates = await pushed.get()
+            sys.stdout.write(
+                f"\nappended {rows.num_rows} rows of {args.indicator} "
+                f"for {args.year}: {len(session.results)} widgets loaded, "
+                f"{len(updates)} refreshed\n"
+            )
+            for update in updates:
+                kind = "delta" if update.delta else "full"
+                sys.stdout.write(
+                    f"{update.widget_id:<25} {kind:<5} {len(update.rows)} rows\n"
+                )
+            await session.close()
+
+        asyncio.run(visit())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Columns derived from a fetched table result instead of extra queries.
+
+`ComputedColumns` adds, for each of its measure columns, the country's rank
+and percentile among all rows and within its group (`REGION`), its z-score
+against all rows and its difference from the group's average:
+
+    GDP_PER_CAPITA_RANK                 1 for the largest value; ties share
+    GDP_PER_CAPITA_PERCENTILE           the best rank; the percentile is the
+    GDP_PER_CAPITA_REGION_RANK          share of rows at or below the value,
+    GDP_PER_CAPITA_REGION_PERCENTILE    from 0 to 100
+    GDP_PER_CAPITA_ZSCORE
+    GDP_PER_CAPITA_VS_REGION
+
+A missing value gets None in every derived column and is left out of the
+others' ranks and averages. All measures go through NumPy as one matrix, so
+a result costs a sort and a few array operations instead of window function
+queries. `atlas.runtime.WarehouseFetcher` derives the columns of the
+widgets in `COMPUTED` as it fetches them, so they are cached and exported
+with the rows they come from.
+
+Usage:
+    python -m atlas.columns SNAPSHOT_DIR [--top 10]
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from atlas import spec
+from atlas.warehouse import LocalSnowflake
+from atlas.warehouse import Selection
+
+Rows = list[dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class ComputedColumns:
+    """Rank, percentile, z-score and group delta of some numeric columns."""
+
+    columns: tuple[str, ...]
+    group: str = "REGION"
+
+    @property
+    def names(self) -> list[str]:
+        """Derived column names, in the order they are added to each row."""
+        return [
+            f"{column}_{suffix}"
+            for column in self.columns
+            for suffix in (
+                "RANK",
+                "PERCENTILE",
+                f"{self.group}_RANK",
+                f"{self.group}_PERCENTILE",
+                "ZSCORE",
+                f"VS_{self.group}",
+            )
+        ]
+
+    def apply(self, rows: Rows) -> Rows:
+        """Copies of `rows` with the derived columns added."""
+        if not rows:
+            return rows
+        values = np.array(
+            [[row.get(column) for column in self.columns] for row in rows],
+            dtype=float,
+        )
+        groups: dict[Any, int] = {}
+        codes = np.array(
+            [groups.setdefault(row.get(self.group), len(groups)) for row in rows]
+        )
+        derived = _derive(values, codes, len(groups))
+        names = self.names
+        return [
+            {**row, **dict(zip(names, record))}
+            for row, record in zip(rows, _records(derived))
+        ]
+
+
+# Measures of `general_overview`, ranked within each region and globally.
+OVERVIEW = ComputedColumns(
+    ("GDP_PER_CAPITA", "UNEMPLOYMENT_RATE", "LIFE_EXPECTANCY", "URBANIZATION_LEVEL")
+)
+
+# Computed columns per widget name.
+COMPUTED: dict[str, ComputedColumns] = {"general_overview": OVERVIEW}
+
+
+def derive(source: spec.DataSource, rows: Rows) -> Rows:
+    """`rows` with the computed columns of `source`'s widget, if it has any."""
+    computed = COMPUTED.get(source.widget_id)
+    return rows if computed is None else computed.apply(rows)
+
+
+def _derive(values: np.ndarray, codes: np.ndarray, groups: int) -> list[np.ndarray]:
+    # Derived columns of an (n, k) matrix of measures with NaN for missing
+    # values, rows grouped by `codes` in range(groups): six per measure.
+    n, k = values.shape
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    # NaN sorts last, so the first `count` entries of each column are valid.
+    ordered = np.sort(values, axis=0)
+    at_most = np.empty((n, k), dtype=np.int64)
+    for measure in range(k):
+        at_most[:, measure] = np.searchsorted(
+            ordered[: count[measure], measure], values[:, measure], side="right"
+        )
+    rank = count - at_most + 1
+    percentile = 100.0 * at_most / np.maximum(count, 1)
+
+    # Ranked within groups by the global order: rows of a group at or below a
+    # row are those whose (group, global position) key is at most its own.
+    keys = codes[:, None] * (n + 1) + at_most
+    sorted_keys = np.sort(np.where(valid, keys, np.iinfo(np.int64).max), axis=0)
+    group_at_most = np.empty((n, k), dtype=np.int64)
+    group_start = np.empty((n, k), dtype=np.int64)
+    for measure in range(k):
+        column = sorted_keys[:, measure]
+        group_at_most[:, measure] = np.searchsorted(column, keys[:, measure], "right")
+        group_start[:, measure] = np.searchsorted(column, codes * (n + 1), "left")
+    group_at_most -= group_start
+    weights = np.where(valid, values, 0.0)
+    group_count = np.stack(
+        [np.bincount(codes, valid[:, measure], groups) for measure in range(k)],
+        axis=1,
+    )[codes]
+    group_sum = np.stack(
+        [np.bincount(codes, weights[:, measure], groups) for measure in range(k)],
+        axis=1,
+    )[codes]
+    group_rank = group_count - group_at_most + 1
+    group_percentile = 100.0 * group_at_most / np.maximum(group_count, 1)
+    vs_group = values - group_sum / np.maximum(group_count, 1)
+    mean = weights.sum(axis=0) / np.maximum(count, 1)
+    std = np.sqrt(
+        np.where(valid, (values - mean) ** 2, 0.0).sum(axis=0) / np.maximum(count, 1)
+    )
+    zscore = (values - mean) / np.where(std > 0, std, np.nan)
+
+    derived = []
+    for measure in range(k):
+        for column in (
+            rank,
+            percentile,
+            group_rank,
+            group_percentile,
+            zscore,
+            vs_group,
+        ):
+            derived.append(np.where(valid[:, measure], column[:, measure], np.nan))
+    return derived
+
+
+def _records(columns: list[np.ndarray]) -> list[tuple[Any, ...]]:
+    # Rows of derived columns as Python values, ranks as ints and NaN as None.
+    values = []
+    for index, column in enumerate(columns):
+        missing = np.isnan(column)
+        if index % 6 in (0, 2):
+            items = np.where(missing, 0, column).astype(np.int64).tolist()
+        else:
+            items = column.tolist()
+        if missing.any():
+            items = [None if gap else item for item, gap in zip(items, missing)]
+        values.append(items)
+    return list(zip(*values))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Derive the overview columns from a snapshot and time it."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.columns")
+    parser.add_argument("snapshot", type=Path)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    sources = spec.load()
+    source = next(source for source in sources if source.widget_id in COMPUTED)
+    computed = COMPUTED[source.widget_id]
+    with LocalSnowflake(args.snapshot) as warehouse:
+        # The rows the widgets it links to open with, such as the year.
+        selection: Selection = {}
+        for upstream in sources:
+            if upstream.widget_id in source.selections:
+                rows = warehouse.execute(upstream.template, selection)
+                selection[upstream.widget_id] = rows[0]
+        start = time.perf_counter()
+        rows = warehouse.execute(source.template, selection)
+        query_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    rows = computed.apply(rows)
+    derive_ms = (time.perf_counter() - start) * 1000
+    sys.stdout.write(
+        f"{source.widget_id}: {len(rows)} rows from the warehouse in {query_ms:.2f} ms, "
+        f"{len(computed.names)} columns derived in {derive_ms:.2f} ms\n\n"
+    )
+    column = computed.columns[0]
+    sys.stdout.write(
+        f"{'country':<30} {'region':<28} {column:>15} {'rank':>5} {'pct':>6} "
+        f"{'in region':>9} {'pct':>6} {'z':>6} {'vs region':>11}\n"
+    )
+    ranked = sorted(
+        (row for row in rows if row[f"{column}_RANK"] is not None),
+        key=lambda row: row[f"{column}_RANK"],
+    )
+    for row in ranked[: args.top]:
+        sys.stdout.write(
+            f"{row['COUNTRY_NAME']:<30} {row[computed.group]:<28} "
+            f"{row[column]:>15.2f} {row[f'{column}_RANK']:>5} "
+            f"{row[f'{column}_PERCENTILE']:>6.1f} "
+            f"{row[f'{column}_{computed.group}_RANK']:>9} "
+            f"{row[f'{column}_{computed.group}_PERCENTILE']:>6.1f} "
+            f"{row[f'{column}_ZSCORE']:>6.2f} "
+            f"{row[f'{column}_VS_{computed.group}']:>11.2f}\n"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""Static export of the dashboard with every selection state precomputed.
+
+Every data source runs once: unlinked widgets as they are, and widgets linked
+to another widget's selection, such as `gdp_growth` and `country_vs_region`,
+once for each row of the widget they link to. Results are stored column by
+column, each column a gzipped JSON array in a file named by the SHA-256 of
+its content, so data shared between results is stored, and cached by
+viewers, once: the dates of every country's `gdp_growth` series, the
+indicator labels and regional figures of `country_vs_region`, the request
+shared by the global tiles. `manifest.json` maps each widget, and each
+selection of a linked widget, to its row count and column files, alongside
+the built dashboard spec. Every widget reads the year selector, so only the
+years given with `--year` are exported, by default the one the dashboard
+opens with, and the exported selector lists just those.
+
+Files are written before the manifest, which replaces the previous one
+atomically; a bundle served while it is re-exported is always consistent.
+Files no longer referenced are removed afterwards.
+
+`BundleFetcher` serves a `atlas.runtime.Session` from a bundle, so views cost
+no warehouse query or API call, and rejects selections it was not exported
+with; `python -m atlas.runtime --bundle DIR` uses it.
+
+Usage:
+    python -m atlas.export SNAPSHOT_DIR BUNDLE_DIR [--year 2020 ...] [--skip-http]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from atlas import spec
+from atlas.params import YEAR_SELECTOR
+from atlas.params import AtlasParams
+from atlas.runtime import WORLD_BANK_API
+from atlas.runtime import Fetcher
+from atlas.runtime import HttpFetcher
+from atlas.runtime import Rows
+from atlas.runtime import WarehouseFetcher
+from atlas.warehouse import LocalSnowflake
+from atlas.warehouse import Selection
+from atlas.warehouse import selected
+
+MANIFEST = "manifest.json"
+
+DATA = "data"
+
+FORMAT_VERSION = 1
+
+
+class Bundle:
+    """Content-addressed files of an export being written."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.files: set[str] = set()
+        self.raw_bytes = 0
+        self.written_bytes = 0
+        self.references = 0
+        self.removed = 0
+        (directory / DATA).mkdir(parents=True, exist_ok=True)
+
+    def add_result(self, rows: Rows) -> dict[str, Any]:
+        """Store a result column by column and return its manifest entry."""
+        names = list(rows[0]) if rows else []
+        return {
+            "rows": len(rows),
+            "columns": {
+                name: self.add([row.get(name) for row in rows]) for name in names
+            },
+        }
+
+    def add(self, value: Any) -> str:
+        """Store a JSON value once and return its file, relative to the bundle."""
+        payload = json.dumps(value, separators=(",", ":"), default=str).encode()
+        name = f"{DATA}/{hashlib.sha256(payload).hexdigest()}.json.gz"
+        self.references += 1
+        self.raw_bytes += len(payload)
+        if name not in self.files:
+            self.files.add(name)
+            path = self.directory / name
+            if not path.exists():
+                # A fixed mtime keeps the files of unchanged results identical.
+                compressed = gzip.compress(payload, compresslevel=9, mtime=0)
+                _write(path, compressed)
+            self.written_bytes += path.stat().st_size
+        return name
+
+    def finish(self, manifest: dict[str, Any]) -> None:
+        """Write the manifest, then remove the files it does not reference."""
+        _write(
+            self.directory / MANIFEST,
+            json.dumps(manifest, separators=(",", ":"), sort_keys=True).encode(),
+        )
+        stale = [
+            path
+            for path in (self.directory / DATA).iterdir()
+            if f"{DATA}/{path.name}" not in self.files
+        ]
+        for path in stale:
+            path.unlink()
+        self.removed = len(stale)
+
+
+def export(
+    fetchers: dict[str, Fetcher],
+    directory: str | Path,
+    sources: list[spec.DataSource] | None = None,
+    choices: Mapping[str, Rows] | None = None,
+) -> Bundle:
+    """Run every data source and selection state, and write the bundle.
+
+    Args:
+        fetchers: fetcher per data source kind; sources of other kinds are
+            left out.
+        directory: bundle directory, created if needed.
+        sources: data sources in layout order, default the dashboard's.
+        choices: rows to keep per widget id, each matched on the columns it
+            names; the widget's result is limited to them, and so are the
+            selections of the widgets linked to it.
+    """
+    bundle = Bundle(Path(directory))
+    choices = choices or {}
+    sources = [
+        source
+        for source in (spec.load() if sources is None else sources)
+        if source.kind in fetchers
+    ]
+    # Rows of each widget per selection of its links, keyed like the manifest.
+    results: dict[str, dict[str, Rows]] = {}
+    links = {source.widget_id: source.links for source in sources}
+    requests: dict[tuple[str, str], tuple[Rows, str]] = {}
+    widgets: dict[str, Any] = {}
+    for source in sources:
+        fetcher = fetchers[source.kind]
+        if not source.selections:
+            key = (source.slug, source.template)
+            if key not in requests:
+                rows = fetcher.fetch(source, {})
+                requests[key] = (rows, bundle.add_result(rows))
+            rows, widgets[source.widget_id] = requests[key]
+            if source.widget_id in choices:
+                rows = _chosen(source, rows, choices[source.widget_id])
+                widgets[source.widget_id] = bundle.add_result(rows)
+            results[source.widget_id] = {_selection_key([]): rows}
+            continue
+        selections = {}
+        results[source.widget_id] = {}
+        for selection in _selections(source, results, links):
+            values = [selected(selection, *link) for link in source.links]
+            key = _selection_key(values)
+            if key in selections:
+                continue
+            rows = fetcher.fetch(source, selection) if all(selection.values()) else []
+            if source.widget_id in choices:
+                rows = _chosen(source, rows, choices[source.widget_id])
+            results[source.widget_id][key] = rows
+            selections[key] = bundle.add_result(rows)
+        widgets[source.widget_id] = {
+            "links": [list(link) for link in source.links],
+            "selections": selections,
+        }
+    import dashboard
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "spec": bundle.add(spec.build_spec(dashboard.build_page())),
+        "widgets": widgets,
+    }
+    bundle.finish(manifest)
+    return bundle
+
+
+def _selections(
+    source: spec.DataSource,
+    results: Mapping[str, Mapping[str, Rows]],
+    links: Mapping[str, list[tuple[str, str]]],
+) -> list[Selection]:
+    # Every combination of rows of the widgets `source` links to, each row
+    # taken from its widget's result under the rows selected upstream of it.
+    combinations: list[dict[str, dict[str, Any]]] = [{}]
+    for widget_id in _upstream(source.selections, links):
+        if widget_id not in results:
+            msg = (
+                f"{source.widget_id} links to {widget_id}, "
+                "which is not exported before it."
+            )
+            raise LookupError(msg)
+        expanded = []
+        for combo in combinations:
+            values = [selected(combo, *link) for link in links[widget_id]]
+            rows = results[widget_id].get(_selection_key(values))
+            expanded.extend({**combo, widget_id: row} for row in rows or [{}])
+        combinations = expanded
+    return combinations
+
+
+def _chosen(source: spec.DataSource, rows: Rows, choices: Rows) -> Rows:
+    # The rows of `source`'s result matching one of `choices`, each of which
+    # must match at least one.
+    def matches(row: dict[str, Any], choice: dict[str, Any]) -> bool:
+        return all(row.get(column) == value for column, value in choice.items())
+
+    missing = [
+        choice for choice in choices if not any(matches(row, choice) for row in rows)
+    ]
+    if missing:
+        msg = f"{source.widget_id} has no row matching {missing}."
+        raise LookupError(msg)
+    return [row for row in rows if any(matches(row, choice) for choice in choices)]
+
+
+def _upstream(
+    widget_ids: list[str], links: Mapping[str, list[tuple[str, str]]]
+) -> list[str]:
+    # `widget_ids` and the widgets they link to, each after those it links to.
+    ordered: dict[str, None] = {}
+
+    def visit(widget_id: str) -> None:
+        for upstream, _ in links.get(widget_id, []):
+            visit(upstream)
+        ordered.setdefault(widget_id)
+
+    for widget_id in widget_ids:
+        visit(widget_id)
+    return list(ordered)
+
+
+def _selection_key(values: list[Any]) -> str:
+    return json.dumps(values, separators=(",", ":"), default=str)
+
+
+def _write(path: Path, payload: bytes) -> None:
+    partial = path.with_name(path.name + ".partial")
+    partial.write_bytes(payload)
+    os.replace(partial, path)
+
+
+class BundleFetcher:
+    """Serves data source requests from an exported bundle, without queries."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.manifest = json.loads((self.directory / MANIFEST).read_text())
+
+    def fetch(self, source: spec.DataSource, selection: Selection) -> Rows:
+        widget = self.manifest["widgets"].get(source.widget_id)
+        if widget is None:
+            msg = f"{source.widget_id} is not in the bundle {self.directory}."
+            raise LookupError(msg)
+        if "links" in widget:
+            values = [selected(selection, *link) for link in widget["links"]]
+            widget = widget["selections"].get(_selection_key(values))
+            if widget is None:
+                msg = (
+                    f"{source.widget_id} was not exported for the selection "
+                    f"{values} in the bundle {self.directory}."
+                )
+                raise LookupError(msg)
+        names = list(widget["columns"])
+        columns = [self.__read(name) for name in widget["columns"].values()]
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def fetch_with_freshness(
+        self, source: spec.DataSource, selection: Selection
+    ) -> tuple[Rows, str | None]:
+        return self.fetch(source, selection), self.manifest["spec"]
+
+    def freshness(self, source: spec.DataSource, selection: Selection) -> str | None:
+        return self.manifest["spec"]
+
+    def invalidate(self, source: spec.DataSource, selection: Selection) -> None:
+        pass
+
+    def __read(self, name: str) -> Any:
+        return json.loads(gzip.decompress((self.directory / name).read_bytes()))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Export the dashboard to a static bundle."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.export")
+    parser.add_argument("snapshot", type=Path)
+    parser.add_argument("bundle", type=Path)
+    parser.add_argument("--http-base-url", default=WORLD_BANK_API)
+    parser.add_argument(
+        "--year",
+        type=int,
+        action="append",
+        help="year to export, repeatable; default the year the dashboard opens with",
+    )
+    parser.add_argument("--skip-http", action="store_true")
+    args = parser.parse_args(argv)
+
+    with LocalSnowflake(args.snapshot) as warehouse:
+        fetchers: dict[str, Fetcher] = {"snowflake": WarehouseFetcher(warehouse)}
+        if not args.skip_http:
+            fetchers["http"] = HttpFetcher(args.http_base_url)
+        years = args.year or [AtlasParams().year]
+        choices = {YEAR_SELECTOR: [{"YEAR": year} for year in years]}
+        try:
+            bundle = export(fetchers, args.bundle, choices=choices)
+        except LookupError as error:
+            parser.error(str(error))
+    sys.stdout.write(
+        f"{bundle.references} columns in {len(bundle.files)} files, "
+        f"{bundle.raw_bytes} bytes of JSON stored as {bundle.written_bytes} "
+        f"compressed; {bundle.removed} stale files removed\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Deterministic synthetic World Bank snapshot for benchmarks and load tests.
+
+The tracked countries keep their real codes, names and regions so the sample
+selections read naturally; the remaining economies are synthetic. Values follow
+a seeded random walk in a plausible range per indicator, so the same seed always
+produces the same snapshot.
+
+Usage:
+    python -m atlas.fixtures SNAPSHOT_DIR [--economies 217] [--seed 2020]
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+
+from atlas.models import INDICATORS
+from atlas.warehouse import write_snapshot
+
+FIRST_YEAR = 1960
+LAST_YEAR = 2023
+
+REGIONS = (
+    "North America",
+    "Europe & Central Asia",
+    "East Asia & Pacific",
+    "Latin America & Caribbean",
+    "Middle East, North Africa, Afghanistan & Pakistan",
+    "Sub-Saharan Africa",
+    "South Asia",
+)
+
+COUNTRIES = {
+    "ARG": ("Argentina", "Latin America & Caribbean"),
+    "AUS": ("Australia", "East Asia & Pacific"),
+    "BRA": ("Brazil", "Latin America & Caribbean"),
+    "CAN": ("Canada", "North America"),
+    "CHN": ("China", "East Asia & Pacific"),
+    "COL": ("Colombia", "Latin America & Caribbean"),
+    "DEU": ("Germany", "Europe & Central Asia"),
+    "EGY": ("Egypt, Arab Rep.", "Middle East, North Africa, Afghanistan & Pakistan"),
+    "FRA": ("France", "Europe & Central Asia"),
+    "GBR": ("United Kingdom", "Europe & Central Asia"),
+    "IND": ("India", "South Asia"),
+    "JPN": ("Japan", "East Asia & Pacific"),
+    "MEX": ("Mexico", "Latin America & Caribbean"),
+    "NGA": ("Nigeria", "Sub-Saharan Africa"),
+    "NZL": ("New Zealand", "East Asia & Pacific"),
+    "PNG": ("Papua New Guinea", "East Asia & Pacific"),
+    "USA": ("United States", "North America"),
+    "ZAF": ("South Africa", "Sub-Saharan Africa"),
+}
+
+# Starting range and yearly drift of each indicator's random walk.
+_RANGES = {
+    "GDP": (1e9, 2e12, 0.05),
+    "GDP_GROWTH": (-3.0, 8.0, 0.0),
+    "GDP_PER_CAPITA": (300.0, 60000.0, 0.04),
+    "TOTAL_POPULATION": (2e5, 1e9, 0.015),
+    "UNEMPLOYMENT_RATE": (2.0, 25.0, 0.0),
+    "LIFE_EXPECTANCY": (40.0, 75.0, 0.003),
+    "URBANIZATION_LEVEL": (10.0, 80.0, 0.005),
+    "RENEWABLE_SHARE": (1.0, 90.0, 0.0),
+    "CO2_EMISSIONS": (0.5, 5000.0, 0.02),
+}
+
+
+def economies(count: int) -> dict[str, tuple[str, str]]:
+    """The tracked countries plus synthetic economies, `count` in total."""
+    result = dict(COUNTRIES)
+    index = 0
+    while len(result) < count:
+        first, second = divmod(index, 26)
+        code = f"X{chr(65 + first)}{chr(65 + second)}"
+        result[code] = (f"Economy {code}", REGIONS[index % len(REGIONS)])
+        index += 1
+    return result
+
+
+def snapshot(economy_count: int = 217, seed: int = 2020) -> dict[str, pa.Table]:
+    """Build the base tables of a synthetic snapshot."""
+    rng = random.Random(seed)
+    countries = economies(economy_count)
+    columns: dict[str, list] = {
+        "COUNTRY_CODE": [],
+        "COUNTRY_NAME": [],
+        "INDICATOR_ID": [],
+        "YEAR": [],
+        "VALUE": [],
+    }
+    for code, (name, _) in {**countries, "1W": ("World", "")}.items():
+        for column, indicator in INDICATORS.items():
+            low, high, drift = _RANGES[column]
+            value = rng.uniform(low, high)
+            for year in range(FIRST_YEAR, LAST_YEAR + 1):
+                if drift:
+                    value *= 1 + drift + rng.gauss(0, drift / 2)
+                else:
+                    value = min(high, max(low, value + rng.gauss(0, (high - low) / 50)))
+                columns["COUNTRY_CODE"].append(code)
+                columns["COUNTRY_NAME"].append(name)
+                columns["INDICATOR_ID"].append(indicator)
+                columns["YEAR"].append(year)
+                columns["VALUE"].append(value)
+    return {
+        "WORLD_BANK_INDICATORS": pa.table(
+            columns,
+            schema=pa.schema(
+                [
+                    ("COUNTRY_CODE", pa.string()),
+                    ("COUNTRY_NAME", pa.string()),
+                    ("INDICATOR_ID", pa.string()),
+                    ("YEAR", pa.int32()),
+                    ("VALUE", pa.float64()),
+                ]
+            ),
+        ),
+        "WORLD_BANK_COUNTRIES": pa.table(
+            {
+                "COUNTRY_CODE": list(countries),
+                "COUNTRY_NAME": [name for name, _ in countries.values()],
+                "REGION": [region for _, region in countries.values()],
+            }
+        ),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Write a synthetic snapshot directory."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.fixtures")
+    parser.add_argument("snapshot", type=Path)
+    parser.add_argument("--economies", type=int, default=217)
+    parser.add_argument("--seed", type=int, default=2020)
+    args = parser.parse_args(argv)
+
+    write_snapshot(args.snapshot, snapshot(args.economies, args.seed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""Fusion of widget queries that load together into one warehouse execution.
+
+Snowflake widgets on the same connector slug and tab are loaded at the same
+moment, so their queries are sent as one, bound to the selections of every
+widget they link to: each becomes a branch of a `UNION ALL` tagged with its
+widget id, its rows packed into a JSON object so branches of different shapes
+line up. Widgets that link to one another, directly or not, keep apart, since
+one needs the other's rows before it can run. `FusedQuery.split` hands each
+widget its own rows back, in the order its query asked for: a top-level
+`ORDER BY` moves into a `ROW_NUMBER()` window inside the branch, with select
+aliases replaced by their expressions.
+
+Queries with a top-level `ORDER BY` that cannot move into a window, such as
+`SELECT DISTINCT` or an ordered `UNION`, keep their own execution.
+
+Usage:
+    python -m atlas.fusion
+"""
+
+import json
+import re
+import sys
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from atlas import spec
+
+Rows = list[dict[str, Any]]
+
+SEQ_COLUMN = "FUSED_SEQ"
+
+# Column of a fused result holding a widget's row as JSON; `ROW` is reserved
+# in Snowflake.
+ROW_COLUMN = "ROW_JSON"
+
+_SELECT = re.compile(r"\s*SELECT\b(?!\s+DISTINCT\b)", re.IGNORECASE)
+_FROM = re.compile(r"\bFROM\b", re.IGNORECASE)
+_ORDER_BY = re.compile(r"\bORDER\s+BY\b", re.IGNORECASE)
+_UNORDERABLE = re.compile(
+    r"\b(UNION|INTERSECT|EXCEPT|MINUS|LIMIT|OFFSET|FETCH|QUALIFY)\b", re.IGNORECASE
+)
+_ALIAS = re.compile(r"\s+AS\s+(\w+)\s*$", re.IGNORECASE)
+_SORT_KEY = re.compile(
+    r"(.*?)(\s+(?:ASC|DESC))?(\s+NULLS\s+(?:FIRST|LAST))?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+@dataclass(frozen=True)
+class FusedQuery:
+    """One execution standing in for the queries of several widgets."""
+
+    source: spec.DataSource
+    widget_ids: tuple[str, ...]
+
+    def split(self, rows: Rows) -> dict[str, Rows]:
+        """Each widget's rows of a fused result, ordered by `WIDGET, SEQ`."""
+        results: dict[str, Rows] = {widget_id: [] for widget_id in self.widget_ids}
+        # One parse of the whole result instead of one per row.
+        records = json.loads(f"[{','.join(row[ROW_COLUMN] for row in rows)}]")
+        columns: dict[str, list[tuple[str, str]] | None] = {}
+        for row, record in zip(rows, records):
+            widget_id = row["WIDGET"]
+            if widget_id not in columns:
+                renamed = [
+                    (key, key.upper()) for key in record if key.upper() != SEQ_COLUMN
+                ]
+                # Records already keyed like the widget's rows are kept as is.
+                same = len(renamed) == len(record) and all(a == b for a, b in renamed)
+                columns[widget_id] = None if same else renamed
+            names = columns[widget_id]
+            results[widget_id].append(
+                record if names is None else {name: record[key] for key, name in names}
+            )
+        return results
+
+
+def plan(sources: Iterable[spec.DataSource]) -> dict[str, FusedQuery]:
+    """Fused query of every widget that shares an execution with another."""
+    sources = list(sources)
+    upstream = _upstream(sources)
+    groups: dict[tuple[Any, ...], list[list[tuple[spec.DataSource, str]]]] = (
+        defaultdict(list)
+    )
+    for source in sources:
+        if source.kind != "snowflake":
+            continue
+        branch = _branch(source.template)
+        if branch is None:
+            continue
+        clusters = groups[source.slug, source.tab]
+        # A widget cannot share an execution with one whose selection it needs,
+        # or that needs its own.
+        cluster = next(
+            (
+                cluster
+                for cluster in clusters
+                if all(
+                    member.widget_id not in upstream[source.widget_id]
+                    and source.widget_id not in upstream[member.widget_id]
+                    for member, _ in cluster
+                )
+            ),
+            None,
+        )
+        if cluster is None:
+            clusters.append(cluster := [])
+        cluster.append((source, branch))
+    fused: dict[str, FusedQuery] = {}
+    for clusters in groups.values():
+        for members in clusters:
+            if len(members) > 1:
+                query = fuse(members)
+                for widget_id in query.widget_ids:
+                    fused[widget_id] = query
+    return fused
+
+
+def fuse(members: list[tuple[spec.DataSource, str]]) -> FusedQuery:
+    """Fuse widget queries already rewritten by `_branch`."""
+    branches = []
+    for index, (source, branch) in enumerate(members):
+        alias = f"fused_{index}"
+        seq = (
+            f"{alias}.{SEQ_COLUMN}" if SEQ_COLUMN in branch else "ROW_NUMBER() OVER ()"
+        )
+        branches.append(
+            f"SELECT '{source.widget_id}' AS WIDGET, {seq} AS SEQ, "
+            f"TO_JSON(OBJECT_CONSTRUCT_KEEP_NULL({alias}.*)) AS {ROW_COLUMN}\n"
+            f"FROM (\n{branch.strip()}\n) AS {alias}"
+        )
+    first = members[0][0]
+    widget_ids = tuple(source.widget_id for source, _ in members)
+    return FusedQuery(
+        source=spec.DataSource(
+            widget_id="+".join(widget_ids),
+            kind=first.kind,
+            slug=first.slug,
+            template="\nUNION ALL\n".join(branches) + "\nORDER BY WIDGET, SEQ",
+            tab=first.tab,
+        ),
+        widget_ids=widget_ids,
+    )
+
+
+def _upstream(sources: list[spec.DataSource]) -> dict[str, set[str]]:
+    # Widgets whose selection each widget needs, even through another widget.
+    links = {source.widget_id: source.selections for source in sources}
+    upstream: dict[str, set[str]] = {}
+
+    def visit(widget_id: str) -> set[str]:
+        if widget_id not in upstream:
+            upstream[widget_id] = set()
+            for linked in links.get(widget_id, []):
+                upstream[widget_id] |= {linked, *visit(linked)}
+        return upstream[widget_id]
+
+    for source in sources:
+        visit(source.widget_id)
+    return upstream
+
+
+def _branch(query: str) -> str | None:
+    # The query with its top-level ORDER BY turned into a SEQ_COLUMN window,
+    # unchanged when unordered, or None when the order cannot move.
+    masked = _mask(query)
+    orders = list(_ORDER_BY.finditer(masked))
+    if not orders:
+        return query
+    select = _SELECT.match(masked)
+    from_ = _FROM.search(masked)
+    if (
+        len(orders) > 1
+        or select is None
+        or from_ is None
+        or _UNORDERABLE.search(masked)
+    ):
+        return None
+    items = _split(
+        query[select.end() : from_.start()], masked[select.end() : from_.start()]
+    )
+    expressions = {}
+    for item, masked_item in items:
+        alias = _ALIAS.search(masked_item)
+        if alias is not None:
+            expressions[alias.group(1).upper()] = item[: alias.start()].strip()
+    order = orders[0]
+    keys = []
+    for key, _ in _split(query[order.end() :], masked[order.end() :]):
+        expression, direction, nulls = _SORT_KEY.match(key.strip()).groups()
+        if expression.isdigit():
+            expression = items[int(expression) - 1][0]
+        expression = expressions.get(expression.upper(), expression)
+        keys.append(f"{expression.strip()}{direction or ''}{nulls or ''}")
+    return (
+        f"{query[: from_.start()].rstrip()},\n"
+        f"    ROW_NUMBER() OVER (ORDER BY {', '.join(keys)}) AS {SEQ_COLUMN}\n"
+        f"{query[from_.start() : order.start()].rstrip()}"
+    )
+
+
+def _mask(query: str) -> str:
+    # The query with string literals and parenthesized text blanked out, so
+    # only top-level keywords and commas are left at their positions.
+    masked = []
+    depth = 0
+    quoted = False
+    for char in query:
+        if quoted:
+            quoted = char != "'"
+            masked.append(" ")
+        elif char == "'":
+            quoted = True
+            masked.append(" ")
+        elif char == "(":
+            depth += 1
+            masked.append(" ")
+        elif char == ")":
+            depth -= 1
+            masked.append(" ")
+        else:
+            masked.append(char if depth == 0 else " ")
+    return "".join(masked)
+
+
+def _split(text: str, masked: str) -> list[tuple[str, str]]:
+    # Top-level comma-separated parts of `text`, each with its masked copy.
+    parts = []
+    start = 0
+    for index, char in enumerate(masked + ","):
+        if char == ",":
+            parts.append((text[start:index], masked[start:index]))
+            start = index + 1
+    return parts
+
+
+def main() -> int:
+    """Print the fused queries of the dashboard."""
+    sources = [source for source in spec.load() if source.kind == "snowflake"]
+    fused = plan(sources)
+    executions = {
+        fused[source.widget_id].source if source.widget_id in fused else source
+        for source in sources
+    }
+    for query in dict.fromkeys(fused.values()):
+        sys.stdout.write(f"-- {query.source.widget_id}\n{query.source.template};\n\n")
+    sys.stdout.write(
+        f"{len(sources)} Snowflake queries in {len(executions)} executions\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
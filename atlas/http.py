@@ -0,0 +1,188 @@
+"""Pooled HTTP client for the `HttpGet` connectors and the ingestion pipeline.
+
+Each connector slug gets one client (see `client`), holding a pool of
+keep-alive connections to its host. Identical GET requests in flight at the
+same time share a single upstream call, and responses with status 429 or 5xx,
+like dropped connections, are retried after an exponential backoff with full
+jitter, or after the server's `Retry-After` when it sends one, capped at the
+same longest delay.
+"""
+
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+from concurrent.futures import Future
+from typing import Any
+
+from atlas import tracing
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpError(Exception):
+    """A request failed with an error status, after any retries."""
+
+    def __init__(self, url: str, status: int, body: bytes) -> None:
+        super().__init__(f"GET {url} returned {status}: {body[:200]!r}")
+        self.url = url
+        self.status = status
+        self.body = body
+
+
+class HttpClient:
+    """Keep-alive GET client for one host."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        max_connections: int = 8,
+        max_retries: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        timeout: float = 30.0,
+    ) -> None:
+        """Constructor for HttpClient class.
+
+        Args:
+            base_url: scheme, host and path prefix of every request.
+            max_connections: most connections open to the host at once.
+            max_retries: retries of a request after the first attempt.
+            backoff: base delay of the first retry, in seconds.
+            max_backoff: longest delay between retries, in seconds, also for
+                a server's `Retry-After`.
+            timeout: socket timeout, in seconds.
+        """
+        parsed = urllib.parse.urlsplit(base_url.rstrip("/"))
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.upstream_requests = 0
+        self.__scheme = parsed.scheme
+        self.__host = parsed.netloc
+        self.__prefix = parsed.path
+        self.__timeout = timeout
+        self.__slots = threading.BoundedSemaphore(max_connections)
+        self.__idle: list[http.client.HTTPConnection] = []
+        self.__lock = threading.Lock()
+        self.__in_flight: dict[str, Future[bytes]] = {}
+        self.__closed = False
+
+    def get(self, path: str) -> bytes:
+        """Body of a GET request, shared with identical requests in flight."""
+        with tracing.span("http.get", path=path):
+            with self.__lock:
+                future = self.__in_flight.get(path)
+                leader = future is None
+                if leader:
+                    future = self.__in_flight[path] = Future()
+            if not leader:
+                tracing.annotate(coalesced=True)
+                return future.result()
+            try:
+                body = self.__get(path)
+            except BaseException as error:
+                future.set_exception(error)
+                raise
+            else:
+                future.set_result(body)
+                tracing.annotate(bytes=len(body))
+                return body
+            finally:
+                with self.__lock:
+                    del self.__in_flight[path]
+
+    def get_json(self, path: str) -> Any:
+        """Decoded JSON body of a GET request."""
+        return json.loads(self.get(path))
+
+    def close(self) -> None:
+        """Close every idle connection, and those in use once they are done."""
+        with self.__lock:
+            self.__closed = True
+            idle, self.__idle = self.__idle, []
+        for connection in idle:
+            connection.close()
+
+    def __get(self, path: str) -> bytes:
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                tracing.annotate(attempts=attempt + 1)
+                status, headers, body = self.__request(self.__prefix + path)
+            except (OSError, http.client.HTTPException):
+                if attempt == self.max_retries:
+                    raise
+            else:
+                tracing.annotate(status=status)
+                if status < 400:
+                    return body
+                if status not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise HttpError(self.base_url + path, status, body)
+                retry_after = _retry_after(headers.get("Retry-After"))
+                if retry_after is not None:
+                    retry_after = min(retry_after, self.max_backoff)
+            cap = min(self.max_backoff, self.backoff * 2**attempt)
+            time.sleep(
+                retry_after if retry_after is not None else random.uniform(0, cap)
+            )
+        raise AssertionError("unreachable")
+
+    def __request(self, target: str) -> tuple[int, http.client.HTTPMessage, bytes]:
+        with self.__slots:
+            connection = self.__connection()
+            with self.__lock:
+                self.upstream_requests += 1
+            try:
+                connection.request("GET", target, headers={"Connection": "keep-alive"})
+                response = connection.getresponse()
+                body = response.read()
+            except BaseException:
+                connection.close()
+                raise
+            with self.__lock:
+                keep = not response.will_close and not self.__closed
+                if keep:
+                    self.__idle.append(connection)
+            if not keep:
+                connection.close()
+            return response.status, response.headers, body
+
+    def __connection(self) -> http.client.HTTPConnection:
+        with self.__lock:
+            if self.__idle:
+                return self.__idle.pop()
+        if self.__scheme == "https":
+            return http.client.HTTPSConnection(self.__host, timeout=self.__timeout)
+        return http.client.HTTPConnection(self.__host, timeout=self.__timeout)
+
+
+def _retry_after(value: str | None) -> float | None:
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+_clients: dict[str, HttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def client(slug: str, base_url: str) -> HttpClient:
+    """The shared client of a connector slug, created on first use.
+
+    A new base URL for the slug replaces its client, closing the old one's
+    idle connections.
+    """
+    with _clients_lock:
+        current = _clients.get(slug)
+        if current is not None and current.base_url == base_url.rstrip("/"):
+            return current
+        if current is not None:
+            current.close()
+        _clients[slug] = HttpClient(base_url)
+        return _clients[slug]
@@ -0,0 +1,345 @@
+"""Incremental World Bank ingestion into the warehouse base tables.
+
+Every indicator in `atlas.models.INDICATORS` is pulled from the World Bank API
+with bounded concurrency. A one-row request per indicator reads the API's
+`lastupdated` date first, and only indicators updated since the previous run
+are fetched in full: the first page gives the page count, and the remaining
+pages are requested concurrently. Each fetched indicator replaces that
+indicator's rows in a single bulk write. Writes run one at a time in a worker
+thread, so the blocking sinks never hold up the requests in flight.
+
+The `lastupdated` date of every loaded indicator is kept in a state file, by
+default `INGEST_STATE.json` in the snapshot directory.
+
+Sinks:
+    snapshot   Arrow snapshot directory read by `atlas.warehouse.LocalSnowflake`
+    snowflake  the live warehouse, configured like `atlas.profile`
+
+Usage:
+    python -m atlas.ingest SNAPSHOT_DIR [--base-url URL] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import urllib.parse
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+from typing import Protocol
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from atlas.http import HttpClient
+from atlas.models import INDICATORS
+from atlas.warehouse import TABLES
+from atlas.warehouse import read_table
+from atlas.warehouse import snowflake_connection
+from atlas.warehouse import write_snapshot
+
+WORLD_BANK_API = "https://api.worldbank.org/v2"
+
+STATE_FILE = "INGEST_STATE.json"
+
+# The World Bank keys countries by ISO3 code; the World aggregate keeps its
+# two-character id, which is what the widgets filter on.
+WORLD = "1W"
+
+INDICATORS_SCHEMA = pa.schema(
+    [
+        ("COUNTRY_CODE", pa.string()),
+        ("COUNTRY_NAME", pa.string()),
+        ("INDICATOR_ID", pa.string()),
+        ("YEAR", pa.int32()),
+        ("VALUE", pa.float64()),
+    ]
+)
+
+COUNTRIES_SCHEMA = pa.schema(
+    [
+        ("COUNTRY_CODE", pa.string()),
+        ("COUNTRY_NAME", pa.string()),
+        ("REGION", pa.string()),
+    ]
+)
+
+
+class IngestError(Exception):
+    """The World Bank API answered with an error message."""
+
+
+class Sink(Protocol):
+    """Bulk destination of ingested rows."""
+
+    def write_countries(self, rows: pa.Table) -> None:
+        """Replace the countries table."""
+
+    def write_indicator(self, indicator: str, rows: pa.Table) -> None:
+        """Replace every row of `indicator` in the indicators table."""
+
+    def close(self) -> None:
+        """Flush pending writes."""
+
+
+class SnapshotSink:
+    """Writes the base tables of a local snapshot directory."""
+
+    def __init__(self, snapshot: str | Path) -> None:
+        self.snapshot = Path(snapshot)
+        self.tables: dict[str, pa.Table] = {}
+        for table in TABLES:
+            try:
+                self.tables[table] = read_table(self.snapshot, table)
+            except FileNotFoundError:
+                continue
+
+    def write_countries(self, rows: pa.Table) -> None:
+        self.tables["WORLD_BANK_COUNTRIES"] = rows
+
+    def write_indicator(self, indicator: str, rows: pa.Table) -> None:
+        current = self.tables.get("WORLD_BANK_INDICATORS")
+        if current is not None:
+            kept = current.filter(pc.field("INDICATOR_ID") != indicator)
+            rows = pa.concat_tables([kept.cast(INDICATORS_SCHEMA), rows])
+        self.tables["WORLD_BANK_INDICATORS"] = rows
+
+    def close(self) -> None:
+        write_snapshot(self.snapshot, self.tables)
+
+
+class SnowflakeSink:
+    """Writes the base tables on the live warehouse.
+
+    Rows are bulk loaded with `write_pandas` into a transient staging table
+    first; its stage and file format DDL would commit any open transaction.
+    The rows they replace are then deleted and the staged rows copied in by
+    one transaction of DML only, so a failed load leaves the table untouched.
+    """
+
+    def __init__(self) -> None:
+        self.connection = snowflake_connection(paramstyle="numeric")
+
+    def write_countries(self, rows: pa.Table) -> None:
+        self.__replace("WORLD_BANK_COUNTRIES", rows, "TRUE", [])
+
+    def write_indicator(self, indicator: str, rows: pa.Table) -> None:
+        self.__replace("WORLD_BANK_INDICATORS", rows, "INDICATOR_ID = :1", [indicator])
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __replace(
+        self, table: str, rows: pa.Table, where: str, parameters: list[Any]
+    ) -> None:
+        from snowflake.connector.pandas_tools import write_pandas
+
+        staging = f"{table}_STAGING"
+        write_pandas(
+            self.connection,
+            rows.to_pandas(),
+            staging,
+            auto_create_table=True,
+            overwrite=True,
+            table_type="transient",
+        )
+        columns = ", ".join(rows.schema.names)
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN")
+        try:
+            cursor.execute(f"DELETE FROM {table} WHERE {where}", parameters)
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging}"
+            )
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+
+
+class Client:
+    """World Bank API client with at most `concurrency` requests in flight.
+
+    Requests reuse up to `concurrency` keep-alive connections and are retried
+    on 429 and 5xx responses, see `atlas.http`.
+    """
+
+    def __init__(self, base_url: str = WORLD_BANK_API, *, concurrency: int) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.http = HttpClient(self.base_url, max_connections=concurrency)
+
+    async def get(self, path: str, **params: Any) -> tuple[dict[str, Any], list]:
+        """Fetch one page, returning its metadata and records."""
+        query = urllib.parse.urlencode({"format": "json", **params})
+        target = f"{path}?{query}"
+        async with self.semaphore:
+            payload = await asyncio.to_thread(self.http.get_json, target)
+        if not isinstance(payload, list) or len(payload) < 2:
+            msg = f"World Bank API error for {self.base_url}{target}: {payload}"
+            raise IngestError(msg)
+        return payload[0], payload[1] or []
+
+    async def last_updated(self, indicator: str) -> str:
+        """The API's `lastupdated` date of an indicator."""
+        meta, _ = await self.get(_indicator_path(indicator), per_page=1)
+        return meta["lastupdated"]
+
+    async def records(self, path: str, *, per_page: int) -> list[dict[str, Any]]:
+        """Every record of a paginated resource."""
+        meta, records = await self.get(path, per_page=per_page, page=1)
+        pages = await asyncio.gather(
+            *(
+                self.get(path, per_page=per_page, page=page)
+                for page in range(2, int(meta["pages"]) + 1)
+            )
+        )
+        for _, page in pages:
+            records.extend(page)
+        return records
+
+
+def _indicator_path(indicator: str) -> str:
+    return f"/country/all/indicator/{indicator}"
+
+
+def countries_table(records: Iterable[dict[str, Any]]) -> pa.Table:
+    """Countries table from `/country` records, aggregates left out."""
+    rows = [
+        {
+            "COUNTRY_CODE": record["id"],
+            "COUNTRY_NAME": record["name"],
+            "REGION": record["region"]["value"].strip(),
+        }
+        for record in records
+        if record["region"]["value"].strip() != "Aggregates"
+    ]
+    return pa.Table.from_pylist(rows, schema=COUNTRIES_SCHEMA)
+
+
+def indicator_table(indicator: str, records: Iterable[dict[str, Any]]) -> pa.Table:
+    """Indicators table rows from indicator records, empty values left out."""
+    rows = [
+        {
+            "COUNTRY_CODE": (
+                WORLD
+                if record["country"]["id"] == WORLD
+                else record["countryiso3code"] or record["country"]["id"]
+            ),
+            "COUNTRY_NAME": record["country"]["value"],
+            "INDICATOR_ID": indicator,
+            "YEAR": int(record["date"]),
+            "VALUE": float(record["value"]),
+        }
+        for record in records
+        if record["value"] is not None
+    ]
+    return pa.Table.from_pylist(rows, schema=INDICATORS_SCHEMA)
+
+
+async def ingest(
+    sink: Sink,
+    state: dict[str, str],
+    *,
+    base_url: str = WORLD_BANK_API,
+    indicators: Iterable[str] = INDICATORS.values(),
+    concurrency: int = 8,
+    per_page: int = 10000,
+    force: bool = False,
+) -> dict[str, int]:
+    """Load the indicators updated since `state` into `sink`.
+
+    Args:
+        sink: destination of the rows.
+        state: `lastupdated` date per indicator from the previous run, updated
+            in place for every indicator loaded.
+        base_url: World Bank API root.
+        indicators: indicator ids to load.
+        concurrency: maximum number of requests in flight.
+        per_page: records per page.
+        force: reload indicators even when they have not been updated.
+
+    Returns:
+        The number of rows written per loaded indicator.
+    """
+    client = Client(base_url, concurrency=concurrency)
+    indicators = list(indicators)
+    countries, updates = await asyncio.gather(
+        client.records("/country", per_page=per_page),
+        asyncio.gather(*(client.last_updated(indicator) for indicator in indicators)),
+    )
+    await asyncio.to_thread(sink.write_countries, countries_table(countries))
+    # Sinks block and are not safe to share between threads.
+    writing = asyncio.Lock()
+
+    loaded: dict[str, int] = {}
+
+    async def load(indicator: str, updated: str) -> None:
+        records = await client.records(_indicator_path(indicator), per_page=per_page)
+        rows = indicator_table(indicator, records)
+        async with writing:
+            await asyncio.to_thread(sink.write_indicator, indicator, rows)
+        state[indicator] = updated
+        loaded[indicator] = rows.num_rows
+
+    await asyncio.gather(
+        *(
+            load(indicator, updated)
+            for indicator, updated in zip(indicators, updates)
+            if force or state.get(indicator) != updated
+        )
+    )
+    return loaded
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Load updated World Bank indicators."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.ingest")
+    parser.add_argument("snapshot", type=Path, nargs="?", help="for --sink snapshot")
+    parser.add_argument("--sink", choices=("snapshot", "snowflake"), default="snapshot")
+    parser.add_argument(
+        "--state", type=Path, help=f"default: SNAPSHOT_DIR/{STATE_FILE}"
+    )
+    parser.add_argument("--base-url", default=WORLD_BANK_API)
+    parser.add_argument("--indicator", action="append", help="default: all tracked")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--per-page", type=int, default=10000)
+    parser.add_argument("--force", action="store_true", help="reload everything")
+    args = parser.parse_args(argv)
+
+    if args.sink == "snapshot" and args.snapshot is None:
+        parser.error("--sink snapshot needs SNAPSHOT_DIR")
+    state_file = args.state
+    if state_file is None:
+        if args.snapshot is None:
+            parser.error("--sink snowflake needs --state")
+        state_file = args.snapshot / STATE_FILE
+    state = json.loads(state_file.read_text()) if state_file.exists() else {}
+
+    sink: Sink = (
+        SnapshotSink(args.snapshot) if args.sink == "snapshot" else SnowflakeSink()
+    )
+    loaded = asyncio.run(
+        ingest(
+            sink,
+            state,
+            base_url=args.base_url,
+            indicators=args.indicator or INDICATORS.values(),
+            concurrency=args.concurrency,
+            per_page=args.per_page,
+            force=args.force,
+        )
+    )
+    sink.close()
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    state_file.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n")
+    for indicator, count in sorted(loaded.items()):
+        sys.stdout.write(f"{indicator:<22} {count:>7} rows\n")
+    if not loaded:
+        sys.stdout.write("No indicator updated since the last run.\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,502 @@
+"""Load test replaying many concurrent visits against local stand-ins.
+
+Each simulated user opens the dashboard on its first tab, then alternates
+between selecting a row of a widget other widgets link to, such as a year in
+the year selector or a country in `general_overview`, which reloads
+`gdp_growth` and `country_vs_region`, and switching to another tab, with an
+exponentially distributed think time between actions. Users start spread over
+the ramp-up period, each with its own `atlas.runtime.Session`, and share:
+
+- the DuckDB stand-in for the Snowflake connector, run with
+  `--warehouse-concurrency` queries at a time and `--warehouse-latency` added
+  to every execution, like a warehouse cluster reached over the network;
+- a local HTTP server standing in for the World Bank API, answering from the
+  snapshot's indicator table after `--api-latency`, reached through the pooled
+  `atlas.http` client the real connector uses;
+- with `--cache`, one in-memory `atlas.cache.ResultCache`.
+
+Every concurrency level reports throughput, the p50/p95/p99 time from a user's
+action until each widget it shows has its rows, queries and API calls per user,
+and the warehouse credits the run would bill: per second while running, at
+least a minute per resume, and until `--auto-suspend` seconds after the last
+query. `--trace FILE` records the spans of a sample of visits for
+`python -m atlas.tracing`.
+
+Usage:
+    python -m atlas.loadgen SNAPSHOT_DIR [--users 10,50,100,500] [--cache]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from collections.abc import Awaitable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from typing import Self
+
+from atlas import spec
+from atlas import tracing
+from atlas.bench import Timing
+from atlas.cache import ResultCache
+from atlas.http import RETRY_STATUSES
+from atlas.runtime import CachingFetcher
+from atlas.runtime import Fetcher
+from atlas.runtime import HttpFetcher
+from atlas.runtime import Rows
+from atlas.runtime import Session
+from atlas.runtime import WarehouseFetcher
+from atlas.warehouse import LocalSnowflake
+from atlas.warehouse import Selection
+
+# Snowflake's default MAX_CONCURRENCY_LEVEL of a warehouse cluster.
+WAREHOUSE_CONCURRENCY = 8
+
+# Shortest time billed each time a warehouse resumes, in seconds.
+MINIMUM_BILLED = 60.0
+
+_INDICATOR_PATH = re.compile(r"/country/([^/]+)/indicator/([^/]+)")
+
+
+class MeteredWarehouse(WarehouseFetcher):
+    """Warehouse fetcher recording when each execution ran.
+
+    At most `concurrency` executions are in flight, each held for `latency`
+    seconds after the stand-in returns its rows.
+    """
+
+    def __init__(
+        self,
+        warehouse: LocalSnowflake,
+        *,
+        latency: float = 0.0,
+        concurrency: int = WAREHOUSE_CONCURRENCY,
+    ) -> None:
+        super().__init__(warehouse)
+        self.latency = latency
+        self.executions: list[tuple[float, float]] = []
+        self.__slots = threading.BoundedSemaphore(concurrency)
+
+    def fetch(self, source: spec.DataSource, selection: Selection) -> Rows:
+        with self.__slots:
+            start = time.perf_counter()
+            rows = super().fetch(source, selection)
+            if self.latency:
+                time.sleep(self.latency)
+            self.executions.append((start, time.perf_counter()))
+        return rows
+
+
+class WorldBankStandIn:
+    """Local server answering World Bank API requests from a snapshot.
+
+    Serves `/country/<codes>/indicator/<ids>?date=<year or range>` in the
+    API's JSON shape, records grouped by indicator in path order, and the
+    `/country` list, paginated by `per_page` and `page`. Statuses queued in
+    `failures` are answered first, one per request, with `Retry-After: 0`;
+    `atlas.ingest` is tested against it.
+    """
+
+    def __init__(
+        self,
+        warehouse: LocalSnowflake,
+        *,
+        latency: float = 0.0,
+        lastupdated: str = "2024-01-01",
+    ) -> None:
+        """Constructor for WorldBankStandIn class.
+
+        Args:
+            warehouse: stand-in whose `WORLD_BANK_INDICATORS` table is served.
+            latency: seconds each response is delayed.
+            lastupdated: `lastupdated` date of every response.
+        """
+        table = warehouse.tables["WORLD_BANK_INDICATORS"]
+        self.latency = latency
+        self.lastupdated = lastupdated
+        self.requests = 0
+        self.failures: list[int] = []
+        self.__countries = warehouse.tables["WORLD_BANK_COUNTRIES"].to_pylist()
+        self.__names: dict[str, str] = {}
+        self.__values: dict[tuple[str, str], dict[int, float]] = defaultdict(dict)
+        for code, name, indicator, year, value in zip(
+            *(
+                table[column].to_pylist()
+                for column in (
+                    "COUNTRY_CODE",
+                    "COUNTRY_NAME",
+                    "INDICATOR_ID",
+                    "YEAR",
+                    "VALUE",
+                )
+            )
+        ):
+            self.__names[code] = name
+            self.__values[code, indicator][year] = value
+        self.__lock = threading.Lock()
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.__server.daemon_threads = True
+        self.__server.stand_in = self  # type: ignore[attr-defined]
+        self.base_url = f"http://127.0.0.1:{self.__server.server_address[1]}"
+        self.__thread = threading.Thread(
+            target=self.__server.serve_forever, daemon=True
+        )
+
+    def __enter__(self) -> Self:
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def respond(self, target: str) -> tuple[int, bytes]:
+        """Status and body of a GET request."""
+        with self.__lock:
+            self.requests += 1
+            failure = self.failures.pop(0) if self.failures else None
+        if failure is not None:
+            return failure, b'[{"message": [{"key": "Unavailable"}]}]'
+        if self.latency:
+            time.sleep(self.latency)
+        path, _, query = target.partition("?")
+        parameters = dict(urllib.parse.parse_qsl(query))
+        if path == "/country":
+            return 200, self.__page(self.__country_records(), parameters)
+        match = _INDICATOR_PATH.fullmatch(path)
+        if match is None:
+            return 404, b'[{"message": [{"key": "Invalid value"}]}]'
+        codes = match.group(1).split(";")
+        if codes == ["all"]:
+            codes = list(self.__names)
+        years = None
+        if "date" in parameters:
+            first, _, last = parameters["date"].partition(":")
+            years = range(int(last or first), int(first) - 1, -1)
+        records = [
+            {
+                "indicator": {"id": indicator, "value": indicator},
+                "country": {"id": code, "value": self.__names.get(code, code)},
+                "countryiso3code": code,
+                "date": str(year),
+                "value": values.get(year),
+            }
+            for indicator in match.group(2).split(";")
+            for code in codes
+            for values in (self.__values.get((code, indicator), {}),)
+            for year in (years or sorted(values, reverse=True))
+        ]
+        return 200, self.__page(records, parameters)
+
+    def __country_records(self) -> list[dict[str, Any]]:
+        # Countries with their region; other economies, like the World, are
+        # aggregates.
+        records = [
+            {
+                "id": country["COUNTRY_CODE"],
+                "name": country["COUNTRY_NAME"],
+                "region": {"value": country["REGION"]},
+            }
+            for country in self.__countries
+        ]
+        listed = {country["COUNTRY_CODE"] for country in self.__countries}
+        records.extend(
+            {"id": code, "name": name, "region": {"value": "Aggregates"}}
+            for code, name in self.__names.items()
+            if code not in listed
+        )
+        return records
+
+    def __page(
+        self, records: list[dict[str, Any]], parameters: dict[str, str]
+    ) -> bytes:
+        per_page = int(parameters.get("per_page", 50))
+        page = int(parameters.get("page", 1))
+        meta = {
+            "page": page,
+            "pages": max(1, -(-len(records) // per_page)),
+            "per_page": per_page,
+            "total": len(records),
+            "lastupdated": self.lastupdated,
+        }
+        body = [meta, records[(page - 1) * per_page : page * per_page]]
+        return json.dumps(body).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        status, body = self.server.stand_in.respond(self.path)  # type: ignore[attr-defined]
+        self.send_response(status)
+        if status in RETRY_STATUSES:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@dataclass
+class Script:
+    """What every simulated user does."""
+
+    actions: int = 4
+    think: float = 1.0
+    select_share: float = 0.5
+
+
+@dataclass
+class Level:
+    """Measurements of one concurrency level."""
+
+    users: int
+    wall: float = 0.0
+    actions: int = 0
+    errors: int = 0
+    queries: int = 0
+    api_calls: int = 0
+    busy: float = 0.0
+    billed: float = 0.0
+    latencies: dict[str, Timing] = field(default_factory=dict)
+
+
+def billed_seconds(
+    executions: list[tuple[float, float]], *, auto_suspend: float
+) -> float:
+    """Seconds a warehouse running `executions` is billed for.
+
+    The warehouse resumes for a query when suspended, and suspends
+    `auto_suspend` seconds after the last query; every resume bills at least
+    `MINIMUM_BILLED` seconds.
+    """
+    billed = 0.0
+    run_start = run_end = None
+    for start, end in sorted(executions):
+        if run_end is not None and start - run_end > auto_suspend:
+            billed += max(MINIMUM_BILLED, run_end - run_start + auto_suspend)
+            run_start = None
+        if run_start is None:
+            run_start, run_end = start, end
+        run_end = max(run_end, end)
+    if run_start is not None:
+        billed += max(MINIMUM_BILLED, run_end - run_start + auto_suspend)
+    return billed
+
+
+async def visit(
+    session: Session, script: Script, rng: random.Random, level: Level
+) -> None:
+    """Replay one user's visit, recording the latency of every widget shown."""
+    linked = {
+        widget_id for source in session.sources for widget_id in source.selections
+    }
+    tab_of = {source.widget_id: source.tab for source in session.sources}
+    tab = session.tabs[0]
+    try:
+        await _timed(session, session.show(tab), level)
+        for _ in range(script.actions):
+            if script.think:
+                await asyncio.sleep(rng.expovariate(1 / script.think))
+            selectable = [
+                widget_id
+                for widget_id in sorted(linked)
+                if tab_of[widget_id] in (None, tab) and session.results.get(widget_id)
+            ]
+            others = [other for other in session.tabs if other != tab]
+            if selectable and (not others or rng.random() < script.select_share):
+                widget_id = rng.choice(selectable)
+                row = rng.choice(session.results[widget_id])
+                await _timed(session, session.select(widget_id, row), level)
+            elif others:
+                tab = rng.choice(others)
+                await _timed(session, session.show(tab), level)
+    finally:
+        await session.close()
+
+
+async def _timed(
+    session: Session, action: Awaitable[dict[str, Rows]], level: Level
+) -> None:
+    # Widgets already loaded, by prefetch or earlier actions, count as 0 ms.
+    start = time.perf_counter()
+    shown = await action
+    level.actions += 1
+    for widget_id in shown:
+        loaded = max(start, session.loaded_at.get(widget_id, start))
+        timing = level.latencies.setdefault(widget_id, Timing())
+        timing.samples.append((loaded - start) * 1000)
+
+
+async def run_level(
+    users: int,
+    fetchers: dict[str, Fetcher],
+    sources: list[spec.DataSource],
+    script: Script,
+    *,
+    ramp: float,
+    seed: int,
+    fuse: bool = True,
+    threads: int = 64,
+) -> Level:
+    """Replay `users` visits starting over `ramp` seconds."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=threads, thread_name_prefix="loadgen")
+    )
+    level = Level(users)
+
+    async def user(index: int) -> None:
+        await asyncio.sleep(ramp * index / users)
+        session = Session(fetchers, sources, fuse=fuse)
+        with tracing.span("visit", user=index, users=users):
+            await visit(session, script, random.Random(f"{seed}-{index}"), level)
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(user(index) for index in range(users)), return_exceptions=True
+    )
+    level.wall = time.perf_counter() - start
+    errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    level.errors = len(errors)
+    if errors:
+        sys.stderr.write(f"{users} users: {len(errors)} failed, first: {errors[0]!r}\n")
+    return level
+
+
+def report(levels: list[Level], *, credits_per_hour: float, credit_price: float) -> str:
+    """Format the summary of every level, then per-widget latencies."""
+    lines = [
+        (
+            f"{'users':>6} {'wall s':>7} {'users/s':>8} {'actions/s':>10} "
+            f"{'errors':>7} {'queries/user':>13} {'api/user':>9} {'busy s':>7} "
+            f"{'billed s':>9} {'credits':>8} {'$/1k users':>11}"
+        )
+    ]
+    for level in levels:
+        credits = level.billed / 3600 * credits_per_hour
+        lines.append(
+            f"{level.users:>6} {level.wall:>7.1f} {level.users / level.wall:>8.1f} "
+            f"{level.actions / level.wall:>10.1f} {level.errors:>7} "
+            f"{level.queries / level.users:>13.1f} "
+            f"{level.api_calls / level.users:>9.1f} {level.busy:>7.1f} "
+            f"{level.billed:>9.0f} {credits:>8.3f} "
+            f"{credits * credit_price / level.users * 1000:>11.2f}"
+        )
+    for level in levels:
+        lines.append(
+            f"\n{level.users} users, ms from action to rows\n"
+            f"{'widget':<25} {'samples':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+        )
+        for widget_id, timing in level.latencies.items():
+            lines.append(
+                f"{widget_id:<25} {len(timing.samples):>8} {timing.p50:>8.1f} "
+                f"{timing.p95:>8.1f} {timing.p99:>8.1f}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Replay increasing numbers of concurrent visits and report each level."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.loadgen")
+    parser.add_argument("snapshot", type=Path)
+    parser.add_argument(
+        "--users", default="10,50,100,500", help="levels, comma-separated"
+    )
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds to start all")
+    parser.add_argument("--actions", type=int, default=4, help="after the page load")
+    parser.add_argument("--think", type=float, default=1.0, help="mean seconds")
+    parser.add_argument("--select-share", type=float, default=0.5)
+    parser.add_argument("--warehouse-latency", type=float, default=0.2)
+    parser.add_argument(
+        "--warehouse-concurrency", type=int, default=WAREHOUSE_CONCURRENCY
+    )
+    parser.add_argument("--api-latency", type=float, default=0.1)
+    parser.add_argument("--cache", action="store_true", help="shared result cache")
+    parser.add_argument("--no-fuse", action="store_true", help="one query per widget")
+    parser.add_argument("--threads", type=int, default=64, help="blocking requests")
+    parser.add_argument("--auto-suspend", type=float, default=60.0)
+    parser.add_argument("--credits-per-hour", type=float, default=1.0, help="X-Small")
+    parser.add_argument("--credit-price", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=2020)
+    parser.add_argument("--trace", type=Path, help="append spans as JSON lines")
+    parser.add_argument("--trace-sample", type=float, default=1.0, help="of visits")
+    args = parser.parse_args(argv)
+
+    if args.trace is not None:
+        tracing.configure(
+            tracing.JsonLinesExporter(args.trace), sample_rate=args.trace_sample
+        )
+
+    script = Script(args.actions, args.think, args.select_share)
+    sources = spec.load()
+    levels = []
+    with (
+        LocalSnowflake(args.snapshot) as warehouse,
+        WorldBankStandIn(warehouse, latency=args.api_latency) as api,
+    ):
+        for users in (int(users) for users in args.users.split(",")):
+            metered = MeteredWarehouse(
+                warehouse,
+                latency=args.warehouse_latency,
+                concurrency=args.warehouse_concurrency,
+            )
+            fetchers: dict[str, Fetcher] = {
+                "snowflake": metered,
+                "http": HttpFetcher(api.base_url),
+            }
+            cache = ResultCache() if args.cache else None
+            if cache is not None:
+                fetchers = {
+                    kind: CachingFetcher(fetcher, cache)
+                    for kind, fetcher in fetchers.items()
+                }
+            api.requests = 0
+            level = asyncio.run(
+                run_level(
+                    users,
+                    fetchers,
+                    sources,
+                    script,
+                    ramp=args.ramp,
+                    seed=args.seed,
+                    fuse=not args.no_fuse,
+                    threads=args.threads,
+                )
+            )
+            if cache is not None:
+                cache.close()
+            level.queries = len(metered.executions)
+            level.api_calls = api.requests
+            level.busy = sum(end - start for start, end in metered.executions)
+            level.billed = billed_seconds(
+                metered.executions, auto_suspend=args.auto_suspend
+            )
+            levels.append(level)
+            sys.stderr.write(f"{users} users done in {level.wall:.1f} s\n")
+    tracing.configure(None)
+    sys.stdout.write(
+        report(
+            levels,
+            credits_per_hour=args.credits_per_hour,
+            credit_price=args.credit_price,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
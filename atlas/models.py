@@ -0,0 +1,263 @@
+"""Derived warehouse tables read by the dashboard widgets.
+
+Each model is a SELECT over the base World Bank tables with a `YEAR` column.
+On Snowflake a model is deployed as a dynamic table refreshed incrementally as
+new indicator rows land; the local stand-in materializes it into a DuckDB table
+and recomputes only the years that received new rows.
+
+Widgets read one year at a time, the one picked in the dashboard's year
+selector, so the models read by year are clustered on `YEAR` first and the
+indicator rows on `(YEAR, INDICATOR_ID)` (`BASE_CLUSTER_BY`): a year's rows sit
+in their own micro-partitions, which a year switch prunes to. Snowflake's
+automatic clustering keeps the base table in that layout as rows land, and
+each dynamic table refresh rewrites the years it recomputes in it.
+
+Usage:
+    python -m atlas.models --warehouse COMPUTE_WH > models.sql
+"""
+
+import argparse
+import sys
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# Indicators tracked by the dashboard, keyed by their column in the pivot.
+INDICATORS = {
+    "GDP": "NY.GDP.MKTP.CD",
+    "GDP_GROWTH": "NY.GDP.MKTP.KD.ZG",
+    "GDP_PER_CAPITA": "NY.GDP.PCAP.CD",
+    "TOTAL_POPULATION": "SP.POP.TOTL",
+    "UNEMPLOYMENT_RATE": "SL.UEM.TOTL.ZS",
+    "LIFE_EXPECTANCY": "SP.DYN.LE00.IN",
+    "URBANIZATION_LEVEL": "SP.URB.TOTL.IN.ZS",
+    "RENEWABLE_SHARE": "EG.FEC.RNEW.ZS",
+    "CO2_EMISSIONS": "EN.GHG.CO2.MT.CE.AR5",
+}
+
+
+@dataclass(frozen=True)
+class Model:
+    """A derived table maintained from the base tables."""
+
+    name: str
+    query: str
+    cluster_by: tuple[str, ...] = ()
+
+    def snowflake_ddl(self, warehouse: str, target_lag: str) -> str:
+        """DDL deploying the model as an incrementally refreshed dynamic table."""
+        cluster_by = ""
+        if self.cluster_by:
+            cluster_by = f"    CLUSTER BY ({', '.join(self.cluster_by)})\n"
+        return (
+            f"CREATE OR REPLACE DYNAMIC TABLE {self.name}\n"
+            f"    TARGET_LAG = '{target_lag}'\n"
+            f"    WAREHOUSE = {warehouse}\n"
+            "    REFRESH_MODE = INCREMENTAL\n"
+            f"{cluster_by}"
+            f"AS{self.query.rstrip()};\n"
+        )
+
+
+def _pivot_columns() -> str:
+    return ",\n".join(
+        f"        MAX(CASE WHEN wbi.INDICATOR_ID = '{indicator}' THEN wbi.VALUE END)"
+        f" AS {column}"
+        for column, indicator in INDICATORS.items()
+    )
+
+
+def _sql_list(values: Iterable[str]) -> str:
+    return ", ".join(f"'{value}'" for value in values)
+
+
+# One row per country per year, one column per tracked indicator. MAX collapses
+# the duplicate indicator rows the widgets used to drop with SELECT DISTINCT.
+COUNTRY_YEAR = Model(
+    name="WORLD_BANK_COUNTRY_YEAR",
+    query=f"""
+    SELECT wbi.COUNTRY_CODE, wbi.COUNTRY_NAME, wbc.REGION, wbi.YEAR,
+{_pivot_columns()}
+    FROM WORLD_BANK_INDICATORS wbi
+    LEFT JOIN WORLD_BANK_COUNTRIES wbc ON wbi.COUNTRY_CODE = wbc.COUNTRY_CODE
+    WHERE wbi.INDICATOR_ID IN ({_sql_list(INDICATORS.values())})
+    GROUP BY wbi.COUNTRY_CODE, wbi.COUNTRY_NAME, wbc.REGION, wbi.YEAR
+""",
+    cluster_by=("YEAR", "COUNTRY_CODE"),
+)
+
+# The epoch-millisecond timestamp timeseries widgets plot for each loaded year,
+# computed once per year rather than for every row of every query.
+YEAR_DIM = Model(
+    name="WORLD_BANK_YEAR_DIM",
+    query="""
+    SELECT DISTINCT YEAR,
+        DATE_PART(EPOCH_SECOND, TO_DATE(YEAR || '-01-01', 'YYYY-MM-DD')) * 1000
+            AS EPOCH_MS
+    FROM WORLD_BANK_INDICATORS
+""",
+)
+
+# Regional aggregates of every tracked indicator, keyed by (region, indicator,
+# year). SUM and COUNT make the rollup incrementally maintainable; AVG, MIN and
+# MAX are kept alongside so widgets read regional figures by key.
+REGION_ROLLUP = Model(
+    name="WORLD_BANK_REGION_ROLLUP",
+    query=f"""
+    WITH country_values AS (
+        SELECT wbc.REGION, wbi.INDICATOR_ID, wbi.YEAR, wbi.COUNTRY_CODE,
+            MAX(wbi.VALUE) AS VALUE
+        FROM WORLD_BANK_INDICATORS wbi
+        JOIN WORLD_BANK_COUNTRIES wbc ON wbi.COUNTRY_CODE = wbc.COUNTRY_CODE
+        WHERE wbi.INDICATOR_ID IN ({_sql_list(INDICATORS.values())})
+            AND wbi.COUNTRY_CODE != '1W'
+            AND wbc.REGION IS NOT NULL
+            AND wbi.VALUE IS NOT NULL
+        GROUP BY wbc.REGION, wbi.INDICATOR_ID, wbi.YEAR, wbi.COUNTRY_CODE
+    )
+    SELECT REGION, INDICATOR_ID, YEAR,
+        SUM(VALUE) AS VALUE_SUM,
+        COUNT(VALUE) AS VALUE_COUNT,
+        AVG(VALUE) AS VALUE_AVG,
+        MIN(VALUE) AS VALUE_MIN,
+        MAX(VALUE) AS VALUE_MAX
+    FROM country_values
+    GROUP BY REGION, INDICATOR_ID, YEAR
+""",
+    cluster_by=("YEAR", "INDICATOR_ID"),
+)
+
+# Indicators compared against the regional figure in `country_vs_region`.
+COMPARED_INDICATORS = {
+    "NY.GDP.MKTP.KD.ZG": "GDP Growth",
+    "EG.FEC.RNEW.ZS": "Renewable Energy",
+    "SL.UEM.TOTL.ZS": "Unemployment Rate",
+    "EN.GHG.CO2.MT.CE.AR5": "Global CO2 Emissions",
+}
+
+
+def _compared_labels() -> str:
+    return "\n".join(
+        f"            WHEN '{indicator}' THEN '{label}'"
+        for indicator, label in COMPARED_INDICATORS.items()
+    )
+
+
+# Every country's value next to its region's, precomputed for all countries so a
+# row selection in the overview table is a key lookup. CO2 is reported as a
+# share of the world total; the other indicators against the regional average.
+COUNTRY_VS_REGION = Model(
+    name="WORLD_BANK_COUNTRY_VS_REGION",
+    query=f"""
+    WITH country_values AS (
+        SELECT wbi.COUNTRY_NAME, wbc.REGION, wbi.YEAR, wbi.INDICATOR_ID,
+            MAX(wbi.VALUE) AS VALUE
+        FROM WORLD_BANK_INDICATORS wbi
+        LEFT JOIN WORLD_BANK_COUNTRIES wbc ON wbi.COUNTRY_CODE = wbc.COUNTRY_CODE
+        WHERE wbi.INDICATOR_ID IN ({_sql_list(COMPARED_INDICATORS)})
+        GROUP BY wbi.COUNTRY_NAME, wbc.REGION, wbi.YEAR, wbi.INDICATOR_ID
+    ),
+    global_co2 AS (
+        SELECT YEAR, MAX(VALUE) AS GLOBAL_TOTAL
+        FROM country_values
+        WHERE INDICATOR_ID = 'EN.GHG.CO2.MT.CE.AR5' AND COUNTRY_NAME = 'World'
+        GROUP BY YEAR
+    )
+    SELECT cv.COUNTRY_NAME, cv.REGION, cv.YEAR,
+        CASE cv.INDICATOR_ID
+{_compared_labels()}
+        END AS INDICATOR,
+        CASE
+            WHEN cv.INDICATOR_ID = 'EN.GHG.CO2.MT.CE.AR5' THEN
+                ROUND((cv.VALUE / gc.GLOBAL_TOTAL) * 100, 2)
+            ELSE cv.VALUE
+        END AS COUNTRY_VALUE,
+        CASE
+            WHEN cv.INDICATOR_ID = 'EN.GHG.CO2.MT.CE.AR5' THEN
+                ROUND((r.VALUE_SUM / gc.GLOBAL_TOTAL) * 100, 2)
+            ELSE r.VALUE_AVG
+        END AS REGIONAL_VALUE
+    FROM country_values cv
+    LEFT JOIN WORLD_BANK_REGION_ROLLUP r
+        ON cv.REGION = r.REGION
+        AND cv.YEAR = r.YEAR
+        AND cv.INDICATOR_ID = r.INDICATOR_ID
+    LEFT JOIN global_co2 gc ON cv.YEAR = gc.YEAR
+""",
+    cluster_by=("YEAR", "COUNTRY_NAME"),
+)
+
+# Longest text indexed by `SEARCH_INDEX`; longer names are matched on their
+# first SEARCH_TEXT_LENGTH characters.
+SEARCH_TEXT_LENGTH = 64
+
+
+def _positions() -> str:
+    return ", ".join(f"({position})" for position in range(1, SEARCH_TEXT_LENGTH - 1))
+
+
+# Search terms of every overview row, keyed by (year, country): each trigram of
+# the lower-cased country name and region, plus their one- and two-character
+# prefixes for shorter searches. A search matches the countries holding every
+# term of the search text, so a keystroke reads a few index keys instead of
+# scanning the pivot.
+SEARCH_INDEX = Model(
+    name="WORLD_BANK_SEARCH_INDEX",
+    query=f"""
+    WITH searchable AS (
+        SELECT YEAR, COUNTRY_CODE, LOWER(COUNTRY_NAME) AS TEXT
+        FROM WORLD_BANK_COUNTRY_YEAR
+        WHERE COUNTRY_CODE != '1W' AND REGION IS NOT NULL
+        UNION ALL
+        SELECT YEAR, COUNTRY_CODE, LOWER(REGION) AS TEXT
+        FROM WORLD_BANK_COUNTRY_YEAR
+        WHERE COUNTRY_CODE != '1W' AND REGION IS NOT NULL
+    ),
+    positions AS (
+        SELECT POSITION FROM (VALUES {_positions()}) AS p(POSITION)
+    ),
+    terms AS (
+        SELECT s.YEAR, s.COUNTRY_CODE, SUBSTR(s.TEXT, p.POSITION, 3) AS TERM
+        FROM searchable s
+        JOIN positions p ON p.POSITION <= LENGTH(s.TEXT) - 2
+        UNION ALL
+        SELECT YEAR, COUNTRY_CODE, SUBSTR(TEXT, 1, 1) AS TERM FROM searchable
+        UNION ALL
+        SELECT YEAR, COUNTRY_CODE, SUBSTR(TEXT, 1, 2) AS TERM FROM searchable
+    )
+    SELECT DISTINCT YEAR, TERM, COUNTRY_CODE
+    FROM terms
+""",
+    cluster_by=("YEAR", "TERM"),
+)
+
+# Clustering keys of the base tables, partitioned by year.
+BASE_CLUSTER_BY = {"WORLD_BANK_INDICATORS": ("YEAR", "INDICATOR_ID")}
+
+# Models in dependency order.
+MODELS = (COUNTRY_YEAR, YEAR_DIM, REGION_ROLLUP, COUNTRY_VS_REGION, SEARCH_INDEX)
+
+
+def base_ddl() -> str:
+    """DDL clustering the base tables, maintained by automatic clustering."""
+    return "".join(
+        f"ALTER TABLE {table} CLUSTER BY ({', '.join(columns)});\n"
+        f"ALTER TABLE {table} RESUME RECLUSTER;\n"
+        for table, columns in BASE_CLUSTER_BY.items()
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Print the Snowflake DDL for the base table layout and every model."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.models")
+    parser.add_argument("--warehouse", default="COMPUTE_WH")
+    parser.add_argument("--target-lag", default="1 day")
+    args = parser.parse_args(argv)
+
+    sys.stdout.write(base_ddl() + "\n")
+    for model in MODELS:
+        sys.stdout.write(model.snowflake_ddl(args.warehouse, args.target_lag) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
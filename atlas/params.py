@@ -0,0 +1,46 @@
+"""Parameters of a copy of the atlas, shared by `dashboard.py` and the tooling.
+
+Kept apart from `dashboard.py` so reading them does not build the page.
+"""
+
+from dataclasses import dataclass
+
+# Widget whose selected `YEAR` every year-dependent widget reads.
+YEAR_SELECTOR = "year_selector"
+
+TABS = ("general_overview", "economic_growth", "environmental_impact", "clean_energy")
+
+
+@dataclass(frozen=True)
+class AtlasParams:
+    """Parameters of one copy of the atlas.
+
+    Args:
+        title: page title.
+        region: World Bank region the country-level widgets are limited to,
+            None for every country.
+        year: year selected when the dashboard opens; a selector at the
+            top switches every Snowflake widget and tile to another year.
+        tabs: tabs to include, a subset of `TABS` in display order.
+        snowflake_slug: slug of the Snowflake connector.
+        http_slug: slug of the World Bank API connector.
+        workspace_slug: workspace the copy is published to.
+        app_slug: app the copy is published to.
+        slug: the copy's dashboard slug.
+    """
+
+    title: str = "Global Economic Atlas"
+    region: str | None = None
+    year: int = 2020
+    tabs: tuple[str, ...] = TABS
+    snowflake_slug: str = "snowflake-world-bank-connector"
+    http_slug: str = "http-world-bank-api-connector"
+    workspace_slug: str = "demo-workspace"
+    app_slug: str = "demo-app"
+    slug: str = "demo-dashboard"
+
+    def __post_init__(self) -> None:
+        unknown = [tab for tab in self.tabs if tab not in TABS]
+        if unknown or not self.tabs:
+            msg = f"Tabs must be a non-empty subset of {TABS}, got {self.tabs}."
+            raise ValueError(msg)
@@ -0,0 +1,255 @@
+"""Pre-publish cost profile of every data source in the dashboard.
+
+Runs each widget's connector request against a backend and reports rows
+returned, bytes scanned, partitions touched and wall time, most expensive
+first. Requests that scan every partition of a partitioned table, or go over
+the given budgets, are flagged; `--strict` turns flags into a failing exit code
+so the profile can gate a publish.
+
+Backends:
+    local      DuckDB stand-in over `--snapshot` (no partition statistics)
+    snowflake  the live warehouse through `snowflake-connector-python`,
+               configured with SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER,
+               SNOWFLAKE_PASSWORD, SNOWFLAKE_WAREHOUSE, SNOWFLAKE_DATABASE and
+               SNOWFLAKE_SCHEMA
+
+HttpGet requests are sent to `--http-base-url`.
+
+Usage:
+    python -m atlas.profile --snapshot SNAPSHOT_DIR [--strict]
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Any
+from typing import Protocol
+
+from atlas import http
+from atlas import spec
+from atlas.warehouse import LocalSnowflake
+from atlas.warehouse import Selection
+from atlas.warehouse import parameterize
+from atlas.warehouse import selected
+from atlas.warehouse import snowflake_connection
+
+WORLD_BANK_API = "https://api.worldbank.org/v2"
+
+
+@dataclass
+class Cost:
+    """What one connector request cost."""
+
+    source: spec.DataSource
+    rows: int
+    wall_ms: float
+    bytes_scanned: int | None = None
+    partitions_scanned: int | None = None
+    partitions_total: int | None = None
+    flags: list[str] = field(default_factory=list)
+
+
+class Backend(Protocol):
+    """Runs a data source and measures it."""
+
+    def run(
+        self, source: spec.DataSource, selection: Selection
+    ) -> tuple[list[dict[str, Any]], Cost]:
+        """Return the request's rows and its cost."""
+
+
+class LocalBackend:
+    """Measures Snowflake requests on the DuckDB stand-in."""
+
+    def __init__(self, warehouse: LocalSnowflake) -> None:
+        self.warehouse = warehouse
+        self.warehouse.connection.execute("PRAGMA enable_profiling='no_output'")
+
+    def run(
+        self, source: spec.DataSource, selection: Selection
+    ) -> tuple[list[dict[str, Any]], Cost]:
+        start = time.perf_counter()
+        rows = self.warehouse.execute(source.template, selection)
+        wall_ms = (time.perf_counter() - start) * 1000
+        profile = json.loads(
+            self.warehouse.connection.get_profiling_information(format="json")
+        )
+        return rows, Cost(
+            source=source,
+            rows=len(rows),
+            wall_ms=wall_ms,
+            bytes_scanned=sum(
+                node.get("result_set_size", 0)
+                for node in _operators(profile)
+                if node.get("operator_rows_scanned")
+            ),
+        )
+
+
+class SnowflakeBackend:
+    """Measures Snowflake requests on the live warehouse, result cache off."""
+
+    def __init__(self) -> None:
+        self.connection = snowflake_connection(paramstyle="numeric")
+        self.connection.cursor().execute("ALTER SESSION SET USE_CACHED_RESULT = FALSE")
+
+    def run(
+        self, source: spec.DataSource, selection: Selection
+    ) -> tuple[list[dict[str, Any]], Cost]:
+        query, links = parameterize(source.template, placeholder=":{}")
+        parameters = [selected(selection, *link) for link in links]
+        cursor = self.connection.cursor()
+        cursor.execute(f"EXPLAIN USING JSON {query}", parameters)
+        stats = json.loads(cursor.fetchone()[0])["GlobalStats"]
+        start = time.perf_counter()
+        cursor.execute(query, parameters)
+        result = cursor.fetchall()
+        wall_ms = (time.perf_counter() - start) * 1000
+        columns = [column[0].upper() for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in result]
+        return rows, Cost(
+            source=source,
+            rows=len(rows),
+            wall_ms=wall_ms,
+            bytes_scanned=stats["bytesAssigned"],
+            partitions_scanned=stats["partitionsAssigned"],
+            partitions_total=stats["partitionsTotal"],
+        )
+
+
+class HttpBackend:
+    """Measures HttpGet requests against the World Bank API."""
+
+    def __init__(self, base_url: str = WORLD_BANK_API) -> None:
+        self.base_url = base_url.rstrip("/")
+
+    def run(
+        self, source: spec.DataSource, selection: Selection
+    ) -> tuple[list[dict[str, Any]], Cost]:
+        start = time.perf_counter()
+        path = spec.http_path(source.template, selection)
+        body = http.client(source.slug, self.base_url).get(path)
+        wall_ms = (time.perf_counter() - start) * 1000
+        payload = json.loads(body)
+        records = (
+            payload[1] if isinstance(payload, list) and len(payload) > 1 else []
+        ) or []
+        return records, Cost(
+            source=source,
+            rows=len(records),
+            wall_ms=wall_ms,
+            bytes_scanned=len(body),
+        )
+
+
+def profile(
+    backends: dict[str, Backend],
+    *,
+    max_ms: float | None = None,
+    max_bytes: int | None = None,
+) -> list[Cost]:
+    """Run every data source once and return the costs, most expensive first.
+
+    Requests linked to another widget's selection use that widget's first row.
+    Widgets sharing one request, like the global tiles, are measured once.
+    """
+    selection: dict[str, dict[str, Any]] = {}
+    costs = []
+    seen = set()
+    for source in spec.load():
+        if source.kind not in backends:
+            continue
+        if any(widget_id not in selection for widget_id in source.selections):
+            continue
+        if (source.slug, source.template) in seen:
+            continue
+        seen.add((source.slug, source.template))
+        rows, cost = backends[source.kind].run(source, selection)
+        if rows:
+            selection.setdefault(source.widget_id, rows[0])
+        cost.flags = _flags(cost, max_ms=max_ms, max_bytes=max_bytes)
+        costs.append(cost)
+    return sorted(costs, key=lambda cost: cost.wall_ms, reverse=True)
+
+
+def _flags(cost: Cost, *, max_ms: float | None, max_bytes: int | None) -> list[str]:
+    flags = []
+    if (
+        cost.partitions_total is not None
+        and cost.partitions_total > 1
+        and cost.partitions_scanned == cost.partitions_total
+    ):
+        flags.append("unpruned scan")
+    if max_ms is not None and cost.wall_ms > max_ms:
+        flags.append(f"over {max_ms:g} ms")
+    if max_bytes is not None and (cost.bytes_scanned or 0) > max_bytes:
+        flags.append(f"over {max_bytes} bytes")
+    return flags
+
+
+def _operators(node: dict[str, Any]) -> list[dict[str, Any]]:
+    operators = [node]
+    for child in node.get("children", []):
+        operators.extend(_operators(child))
+    return operators
+
+
+def report(costs: list[Cost]) -> str:
+    """Format costs as a table."""
+    total_ms = sum(cost.wall_ms for cost in costs) or 1.0
+    lines = [
+        (
+            f"{'widget':<25} {'kind':<9} {'rows':>6} {'bytes':>10} "
+            f"{'partitions':>12} {'ms':>9} {'share':>6}  flags"
+        )
+    ]
+    for cost in costs:
+        partitions = (
+            "-"
+            if cost.partitions_total is None
+            else f"{cost.partitions_scanned}/{cost.partitions_total}"
+        )
+        scanned = "-" if cost.bytes_scanned is None else str(cost.bytes_scanned)
+        lines.append(
+            f"{cost.source.widget_id:<25} {cost.source.kind:<9} {cost.rows:>6} "
+            f"{scanned:>10} {partitions:>12} {cost.wall_ms:>9.1f} "
+            f"{cost.wall_ms / total_ms:>6.0%}  {', '.join(cost.flags)}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Profile the dashboard's data sources."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.profile")
+    parser.add_argument("--backend", choices=("local", "snowflake"), default="local")
+    parser.add_argument("--snapshot", type=Path, help="snapshot for --backend local")
+    parser.add_argument("--http-base-url", default=WORLD_BANK_API)
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--max-ms", type=float)
+    parser.add_argument("--max-bytes", type=int)
+    parser.add_argument("--strict", action="store_true", help="fail on any flag")
+    args = parser.parse_args(argv)
+
+    if args.backend == "local" and args.snapshot is None:
+        parser.error("--backend local needs --snapshot")
+    backends: dict[str, Backend] = {
+        "snowflake": (
+            LocalBackend(LocalSnowflake(args.snapshot))
+            if args.backend == "local"
+            else SnowflakeBackend()
+        )
+    }
+    if not args.skip_http:
+        backends["http"] = HttpBackend(args.http_base_url)
+
+    costs = profile(backends, max_ms=args.max_ms, max_bytes=args.max_bytes)
+    sys.stdout.write(report(costs))
+    return 1 if args.strict and any(cost.flags for cost in costs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
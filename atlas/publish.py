@@ -0,0 +1,254 @@
+"""Publish the dashboard only when its built spec changed.
+
+The built spec is split into nodes: every widget, every tab of a tab section,
+and the page layout around them, each hashed with the widgets and tabs it
+contains replaced by references. The hashes are compared with those of the
+last version published from this checkout, kept in `.publish-state.json`, and
+the publish is skipped when no node changed. Otherwise the changed nodes are
+listed and a new version is published.
+
+The platform API creates versions from a whole layout, so a publish always
+uploads the full spec; what the node hashes save is every publish of an
+unchanged dashboard, and they show which nodes a new version touches.
+
+Usage:
+    python -m atlas.publish [--dry-run] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Any
+
+from engineai.sdk.dashboard.dashboard.page.page import Page
+
+from atlas.spec import build_spec
+
+STATE_FILE = Path(".publish-state.json")
+
+# Serializes updates of the state file between publishes running in threads.
+_state_lock = threading.Lock()
+
+
+@dataclass
+class Changes:
+    """Nodes that differ between two publishes."""
+
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def report(self) -> str:
+        """Format the changes one node per line."""
+        lines = [
+            f"{mark} {node}\n"
+            for mark, nodes in (
+                ("+", self.added),
+                ("~", self.changed),
+                ("-", self.removed),
+            )
+            for node in nodes
+        ]
+        return "".join(lines)
+
+
+def node_hashes(spec: dict[str, Any]) -> dict[str, str]:
+    """Hash every widget, tab and the page layout of a built spec.
+
+    Keys are `widget/<widgetId>`, `tab/<label>` and `page`.
+    """
+    hashes: dict[str, str] = {}
+
+    def strip(node: Any) -> Any:
+        if isinstance(node, list):
+            return [strip(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+        if "widgetId" in node and "widgetType" in node:
+            hashes[f"widget/{node['widgetId']}"] = _digest(node)
+            return {"widgetRef": node["widgetId"]}
+        if "tabSection" in node:
+            options = []
+            for option in node["tabSection"]["options"]:
+                label = option["label"]["template"]
+                hashes[f"tab/{label}"] = _digest(strip(option["item"]))
+                options.append({**option, "item": {"tabRef": label}})
+            node = {**node, "tabSection": {**node["tabSection"], "options": options}}
+        return {key: strip(value) for key, value in node.items()}
+
+    hashes["page"] = _digest(strip(spec))
+    return hashes
+
+
+def _digest(node: Any) -> str:
+    encoded = _encode(_normalized(node)).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _encode(node: Any) -> str:
+    return json.dumps(node, sort_keys=True, separators=(",", ":"))
+
+
+def _normalized(node: Any) -> Any:
+    # The SDK collects a widget's dependencies in no fixed order, so they are
+    # hashed sorted; the order of every other list is part of the spec.
+    if isinstance(node, list):
+        return [_normalized(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    normalized = {key: _normalized(value) for key, value in node.items()}
+    if isinstance(normalized.get("dependencies"), list):
+        normalized["dependencies"] = sorted(normalized["dependencies"], key=_encode)
+    return normalized
+
+
+def diff(before: dict[str, str], after: dict[str, str]) -> Changes:
+    """Compare two sets of node hashes."""
+    return Changes(
+        added=sorted(after.keys() - before.keys()),
+        changed=sorted(
+            node for node in after.keys() & before.keys() if after[node] != before[node]
+        ),
+        removed=sorted(before.keys() - after.keys()),
+    )
+
+
+def publish(
+    page: Page,
+    *,
+    workspace_slug: str,
+    app_slug: str,
+    slug: str,
+    activate: bool = True,
+    state_file: Path = STATE_FILE,
+    force: bool = False,
+    dry_run: bool = False,
+) -> str | None:
+    """Publish `page` as a new dashboard version if any node changed.
+
+    Args:
+        page: dashboard page, not yet built.
+        workspace_slug: the workspace's identifier.
+        app_slug: the app's identifier.
+        slug: the dashboard's identifier.
+        activate: whether to activate the new version.
+        state_file: where the node hashes of the last publish are kept.
+        force: publish even when nothing changed.
+        dry_run: report the changes without publishing.
+
+    Returns:
+        The published version, or None when nothing was published.
+    """
+    return publish_spec(
+        build_spec(page, slug),
+        workspace_slug=workspace_slug,
+        app_slug=app_slug,
+        slug=slug,
+        activate=activate,
+        state_file=state_file,
+        force=force,
+        dry_run=dry_run,
+    )
+
+
+def publish_spec(
+    spec: dict[str, Any],
+    *,
+    workspace_slug: str,
+    app_slug: str,
+    slug: str,
+    activate: bool = True,
+    state_file: Path = STATE_FILE,
+    force: bool = False,
+    dry_run: bool = False,
+    prefix: str = "",
+) -> str | None:
+    """Publish a spec built by `atlas.spec.build_spec` if any node changed.
+
+    Takes the arguments of `publish`, with the built spec in place of the page;
+    `prefix` starts every line reported. Safe to call from several threads.
+    """
+    nodes = node_hashes(spec)
+    key = f"{workspace_slug}/{app_slug}/{slug}"
+    with _state_lock:
+        previous = _read_state(state_file).get(key, {})
+    changes = diff(previous.get("nodes", {}), nodes)
+
+    if not changes and not force:
+        sys.stdout.write(
+            f"{prefix}No changes since version {previous['version']}, "
+            "nothing to publish.\n"
+        )
+        return None
+    sys.stdout.write(
+        "".join(f"{prefix}{line}\n" for line in changes.report().splitlines())
+    )
+    if dry_run:
+        return None
+
+    from engineai.sdk.api.client import api_client
+
+    version = api_client.dashboard_version.create_dashboard_version(
+        workspace_slug=workspace_slug,
+        app_slug=app_slug,
+        dashboard_slug=slug,
+        layout={"page": spec},
+    )
+    if activate:
+        api_client.dashboard_version.activate_dashboard_version(
+            workspace_slug=workspace_slug,
+            app_slug=app_slug,
+            dashboard_slug=slug,
+            version=version.version,
+        )
+    with _state_lock:
+        # Re-read so versions recorded by concurrent publishes are kept.
+        state = _read_state(state_file)
+        state[key] = {"version": version.version, "nodes": nodes}
+        state_file.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n")
+    sys.stdout.write(
+        f"{prefix}Dashboard version {version.version} has been published"
+        f"{' and activated' if activate else ''}.\n"
+    )
+    return version.version
+
+
+def _read_state(state_file: Path) -> dict[str, Any]:
+    return json.loads(state_file.read_text()) if state_file.exists() else {}
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Publish `dashboard.py` if it changed since the last publish."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.publish")
+    parser.add_argument("--state", type=Path, default=STATE_FILE)
+    parser.add_argument("--force", action="store_true", help="publish unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="only list changes")
+    parser.add_argument("--no-activate", action="store_true")
+    args = parser.parse_args(argv)
+
+    import dashboard
+
+    publish(
+        dashboard.page,
+        workspace_slug=os.environ.get("WORKSPACE_SLUG", "demo-workspace"),
+        app_slug=os.environ.get("APP_SLUG", "demo-app"),
+        slug=os.environ.get("DASHBOARD_SLUG", "demo-dashboard"),
+        activate=not args.no_activate,
+        state_file=args.state,
+        force=args.force,
+        dry_run=args.dry_run,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,794 @@
+"""Tab-aware loading of the dashboard's data sources for one visit.
+
+A session fetches the widgets outside the tab section and those of the active
+tab first, then prefetches the other tabs in layout order in the background,
+with fewer requests in flight than the foreground. Showing another tab cancels
+the prefetch requests that have not started yet, loads that tab's widgets
+first, and restarts the prefetch for what is left; closing the session cancels
+everything still pending.
+
+Widgets linked to another widget's selection wait for that widget, whichever
+tab it is in, and use its first row as the selection until `Session.select`
+picks another row. Widgets sharing one request, like the global tiles, fetch
+it once, and Snowflake widgets loaded together share one execution, see
+`atlas.fusion`. With `--cache`, requests go through an
+`atlas.cache.ResultCache` first.
+
+With `--trace FILE`, every fetch is recorded as a span, see `atlas.tracing`.
+
+`Session.stream` sends a Snowflake widget's rows as Arrow IPC chunks as the
+warehouse produces them, for results too large to load at once (see
+`atlas.transport`).
+
+`Session.watch` follows a change feed (see `atlas.changes`): when indicator
+rows land, only the loaded widgets whose queries read the changed indicators
+and years are fetched again, and timeseries widgets fetch just the changed
+points.
+
+`--year` selects another year in the dashboard's year selector once the
+visit has loaded, and reports how long reloading the widgets that read it took.
+
+Usage:
+    python -m atlas.runtime SNAPSHOT_DIR [--tab "Economic Growth"] [--cache DIR]
+        [--year 2019]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+import urllib.parse
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+from typing import Protocol
+
+import pyarrow as pa
+
+from atlas import changes
+from atlas import columns
+from atlas import fusion
+from atlas import http
+from atlas import spec
+from atlas import tracing
+from atlas import transport
+from atlas.cache import DEFAULT_TTL
+from atlas.cache import ResultCache
+from atlas.cache import cache_key
+from atlas.params import YEAR_SELECTOR
+from atlas.warehouse import BATCH_ROWS
+from atlas.warehouse import LocalSnowflake
+from atlas.warehouse import Selection
+from atlas.warehouse import selected
+
+WORLD_BANK_API = "https://api.worldbank.org/v2"
+
+# Chunks of a streamed result waiting for the client before the warehouse
+# is held back.
+STREAM_DEPTH = 2
+
+Rows = list[dict[str, Any]]
+
+
+class Fetcher(Protocol):
+    """Runs one data source request, blocking."""
+
+    def fetch(self, source: spec.DataSource, selection: Selection) -> Rows:
+        """Return the request's rows."""
+
+    def fetch_with_freshness(
+        self, source: spec.DataSource, selection: Selection
+    ) -> tuple[Rows, str | None]:
+        """Return the request's rows and the `freshness` token they were read at."""
+
+    def freshness(self, source: spec.DataSource, selection: Selection) -> str | None:
+        """Return a token that changes whenever the request's data changes."""
+
+    def invalidate(self, source: spec.DataSource, selection: Selection) -> None:
+        """Forget any copy of the request's rows older than its data."""
+
+
+class WarehouseFetcher:
+    """Runs Snowflake requests on the local stand-in, one at a time.
+
+    Rows of widgets with computed columns come with them, see `atlas.columns`.
+    """
+
+    def __init__(self, warehouse: LocalSnowflake) -> None:
+        self.warehouse = warehouse
+        self.lock = threading.Lock()
+
+    def fetch(self, source: spec.DataSource, selection: Selection) -> Rows:
+        with tracing.span("warehouse.execute") as span:
+            waited = time.perf_counter()
+            with self.lock:
+                if span is not None:
+                    span.attributes["lock_wait_ms"] = (
+                        time.perf_counter() - waited
+                    ) * 1000
+                rows = self.warehouse.execute(source.template, selection)
+            tracing.annotate(rows=len(rows))
+        return columns.derive(source, rows)
+
+    def fetch_with_freshness(
+        self, source: spec.DataSource, selection: Selection
+    ) -> tuple[Rows, str | None]:
+        # The version is read first so a change during the fetch is seen on
+        # the next revalidation.
+        version = self.warehouse.version
+        return self.fetch(source, selection), version
+
+    @contextmanager
+    def stream(
+        self,
+        source: spec.DataSource,
+        selection: Selection,
+        *,
+        batch_rows: int = BATCH_ROWS,
+    ) -> Iterator[pa.RecordBatchReader]:
+        """Hold the warehouse while the request's result is read batch by batch."""
+        with self.lock:
+            reader = self.warehouse.fetch_batches(
+                source.template, selection, batch_rows=batch_rows
+            )
+            try:
+                yield reader
+            finally:
+                reader.close()
+
+    def freshness(self, source: spec.DataSource, selection: Selection) -> str | None:
+        return self.warehouse.version
+
+    def invalidate(self, source: spec.DataSource, selection: Selection) -> None:
+        pass
+
+
+class HttpFetcher:
+    """Runs HttpGet requests against the World Bank API.
+
+    Requests share the connector's keep-alive pool, and identical requests in
+    flight at once, like those of the global tiles, go upstream once.
+    """
+
+    def __init__(self, base_url: str = WORLD_BANK_API) -> None:
+        self.base_url = base_url.rstrip("/")
+
+    def fetch(self, source: spec.DataSource, selection: Selection) -> Rows:
+        return self.fetch_with_freshness(source, selection)[0]
+
+    def fetch_with_freshness(
+        self, source: spec.DataSource, selection: Selection
+    ) -> tuple[Rows, str | None]:
+        payload = http.client(source.slug, self.base_url).get_json(
+            spec.http_path(source.template, selection)
+        )
+        rows = (
+            payload[1] if isinstance(payload, list) and len(payload) > 1 else []
+        ) or []
+        return rows, _last_updated(payload)
+
+    def freshness(self, source: spec.DataSource, selection: Selection) -> str | None:
+        # A one-record page carries the same `lastupdated` date as the full one.
+        path, _, query = spec.http_path(source.template, selection).partition("?")
+        parameters = dict(urllib.parse.parse_qsl(query), per_page="1")
+        return _last_updated(
+            http.client(source.slug, self.base_url).get_json(
+                f"{path}?{urllib.parse.urlencode(parameters, safe=';')}"
+            )
+        )
+
+    def invalidate(self, source: spec.DataSource, selection: Selection) -> None:
+        pass
+
+
+class CachingFetcher:
+    """Serves another fetcher's requests from a `ResultCache`."""
+
+    def __init__(self, fetcher: Fetcher, cache: ResultCache) -> None:
+        self.fetcher = fetcher
+        self.cache = cache
+
+    def fetch(self, source: spec.DataSource, selection: Selection) -> Rows:
+        return self.cache.get(
+            _cache_key(source, selection),
+            lambda: self.fetcher.fetch_with_freshness(source, selection),
+            lambda: self.fetcher.freshness(source, selection),
+        )
+
+    def fetch_with_freshness(
+        self, source: spec.DataSource, selection: Selection
+    ) -> tuple[Rows, str | None]:
+        # Cached rows may be older than the source's current token.
+        return self.fetch(source, selection), None
+
+    def freshness(self, source: spec.DataSource, selection: Selection) -> str | None:
+        return self.fetcher.freshness(source, selection)
+
+    def invalidate(self, source: spec.DataSource, selection: Selection) -> None:
+        self.fetcher.invalidate(source, selection)
+        self.cache.invalidate(
+            _cache_key(source, selection), self.fetcher.freshness(source, selection)
+        )
+
+
+def _last_updated(payload: Any) -> str | None:
+    # The `lastupdated` date of a World Bank API response's page metadata.
+    if isinstance(payload, list) and payload and isinstance(payload[0], dict):
+        return payload[0].get("lastupdated")
+    return None
+
+
+def _cache_key(source: spec.DataSource, selection: Selection) -> str:
+    values = [selected(selection, *link) for link in source.links]
+    return cache_key(source.slug, source.template, values)
+
+
+@dataclass(frozen=True)
+class Update:
+    """Rows pushed to a loaded widget after a change."""
+
+    widget_id: str
+    rows: Rows
+    # Timeseries points to merge into the widget's rows, not all of them.
+    delta: bool
+
+
+class Session:
+    """Loads one visit's data sources tab by tab."""
+
+    def __init__(
+        self,
+        fetchers: dict[str, Fetcher],
+        sources: Iterable[spec.DataSource] | None = None,
+        *,
+        concurrency: int = 4,
+        prefetch_concurrency: int = 1,
+        fuse: bool = True,
+    ) -> None:
+        """Constructor for Session class.
+
+        Args:
+            fetchers: fetcher per data source kind, `snowflake` or `http`.
+            sources: data sources in layout order, default the dashboard's.
+            concurrency: requests in flight for the tab being shown.
+            prefetch_concurrency: requests in flight for background prefetch.
+            fuse: run queries loaded together as one, see `atlas.fusion`.
+        """
+        self.fetchers = fetchers
+        self.sources = [
+            source
+            for source in (spec.load() if sources is None else sources)
+            if source.kind in fetchers
+        ]
+        self.results: dict[str, Rows] = {}
+        self.loaded_at: dict[str, float] = {}
+        self.fetched: list[str] = []
+        self.__by_widget = {source.widget_id: source for source in self.sources}
+        # Computed columns are derived from a widget's own request.
+        self.__fused = (
+            fusion.plan(
+                source
+                for source in self.sources
+                if source.widget_id not in columns.COMPUTED
+            )
+            if fuse
+            else {}
+        )
+        self.__selected: dict[str, dict[str, Any]] = {}
+        self.__refreshing = asyncio.Lock()
+        self.__refreshes: set[asyncio.Task[list[Update]]] = set()
+        self.__foreground = asyncio.Semaphore(concurrency)
+        self.__background = asyncio.Semaphore(prefetch_concurrency)
+        self.__requests: dict[tuple[str, str, str], asyncio.Task[Rows]] = {}
+        self.__prefetching: set[tuple[str, str, str]] = set()
+        self.__started: set[tuple[str, str, str]] = set()
+        self.__prefetch: asyncio.Task[None] | None = None
+        self.__tab: str | None = None
+
+    @property
+    def tabs(self) -> list[str]:
+        """Tab labels in layout order."""
+        return list(dict.fromkeys(source.tab for source in self.sources if source.tab))
+
+    async def show(self, tab: str | None) -> dict[str, Rows]:
+        """Load the widgets visible on `tab`, then prefetch the other tabs.
+
+        Returns:
+            Rows per widget id of the visible widgets.
+        """
+        self.__tab = tab
+        visible = [source for source in self.sources if source.tab in (None, tab)]
+        self.__cancel_prefetch(keep=self.__needed(visible))
+        with tracing.span("show", tab=tab):
+            results = await asyncio.gather(
+                *(self.__load(source, self.__foreground) for source in visible)
+            )
+        hidden = [source for source in self.sources if source.tab not in (None, tab)]
+        self.__prefetch = asyncio.create_task(self.__prefetch_all(hidden))
+        return {source.widget_id: rows for source, rows in zip(visible, results)}
+
+    async def select(self, widget_id: str, row: dict[str, Any]) -> dict[str, Rows]:
+        """Select a row of a widget and reload the widgets linked to it.
+
+        Linked widgets of the tab being shown are reloaded at once, those of
+        the other tabs are dropped and prefetched again in the background.
+
+        Returns:
+            Rows per widget id of the reloaded visible widgets.
+        """
+        self.__selected[widget_id] = row
+        linked = [
+            source for source in self.sources if self.__links_to(source, widget_id)
+        ]
+        for source in linked:
+            self.results.pop(source.widget_id, None)
+        visible = [source for source in linked if source.tab in (None, self.__tab)]
+        self.__cancel_prefetch(keep=self.__needed(visible))
+        with tracing.span("select", widget=widget_id):
+            results = await asyncio.gather(
+                *(self.__load(source, self.__foreground) for source in visible)
+            )
+        hidden = [
+            source for source in self.sources if source.tab not in (None, self.__tab)
+        ]
+        self.__prefetch = asyncio.create_task(self.__prefetch_all(hidden))
+        return {source.widget_id: rows for source, rows in zip(visible, results)}
+
+    async def stream(
+        self,
+        widget_id: str,
+        *,
+        compression: str | None = None,
+        batch_rows: int = BATCH_ROWS,
+    ) -> AsyncIterator[bytes]:
+        """Stream a Snowflake widget's rows as `atlas.transport` chunks.
+
+        Batches are read from the warehouse only while fewer than
+        `STREAM_DEPTH` chunks wait to be consumed, so memory is bounded by the
+        batch size rather than the result size. The rows are not kept in
+        `results`, and come without the columns of `atlas.columns`.
+
+        Args:
+            widget_id: widget to stream, loading the widgets it links to first.
+            compression: buffer compression, one of `transport.COMPRESSIONS`.
+            batch_rows: rows per batch.
+        """
+        source = self.__by_widget[widget_id]
+        fetcher = self.fetchers[source.kind]
+        if not isinstance(fetcher, WarehouseFetcher):
+            msg = f"{widget_id} is not served from the warehouse, it cannot stream."
+            raise TypeError(msg)
+        for linked in source.selections:
+            await self.__load(self.__by_widget[linked], self.__foreground)
+        selection = self.__selection(source)
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue[bytes | None] = asyncio.Queue(STREAM_DEPTH)
+        stopped = threading.Event()
+
+        def put(chunk: bytes | None) -> None:
+            asyncio.run_coroutine_threadsafe(chunks.put(chunk), loop).result()
+
+        def produce() -> None:
+            # Runs in a worker thread, so the span does not outlive a yield.
+            with tracing.span("stream", **_attributes(source, selection)) as span:
+                try:
+                    with fetcher.stream(
+                        source, selection, batch_rows=batch_rows
+                    ) as reader:
+                        chunks_read = transport.encode_batches(reader, compression)
+                        for count, chunk in enumerate(chunks_read, 1):
+                            if stopped.is_set():
+                                return
+                            if count == 1 and span is not None:
+                                span.attributes["first_chunk_ms"] = span.duration_ms
+                            tracing.annotate(chunks=count)
+                            put(chunk)
+                finally:
+                    put(None)
+
+        async with self.__foreground:
+            self.fetched.append(source.widget_id)
+            producer = asyncio.ensure_future(asyncio.to_thread(produce))
+            finished = False
+            try:
+                while True:
+                    chunk = await chunks.get()
+                    if chunk is None:
+                        finished = True
+                        break
+                    yield chunk
+            finally:
+                # Unblock the producer when the client stopped early.
+                stopped.set()
+                while not finished:
+                    finished = await chunks.get() is None
+                await producer
+
+    async def refresh(self, change: changes.Change) -> list[Update]:
+        """Fetch again the loaded widgets whose data `change` touches.
+
+        Timeseries widgets fetch only the points of the changed years. Widgets
+        linked to a refreshed widget whose selection moved, such as when the
+        first row changed, reload as well.
+
+        Returns:
+            The rows pushed to each refreshed widget.
+        """
+        async with self.__refreshing:
+            # Requests that finished before the change are not reused.
+            done = {key for key, task in self.__requests.items() if task.done()}
+            for key in done:
+                del self.__requests[key]
+            self.__started -= done
+            self.__prefetching -= done
+            linked = [source for source in self.sources if source.selections]
+            before = {source.widget_id: self.__selection(source) for source in linked}
+            updates = []
+            for batch in (
+                [source for source in self.sources if not source.selections],
+                linked,
+            ):
+                refetches = []
+                for source in batch:
+                    if source.widget_id not in self.results:
+                        continue
+                    if self.__touches(source, change):
+                        refetches.append(self.__refetch(source, change))
+                    elif self.__selection(source) != before.get(source.widget_id, {}):
+                        refetches.append(self.__refetch(source, None))
+                updates += [
+                    update
+                    for update in await asyncio.gather(*refetches)
+                    if update is not None
+                ]
+            return updates
+
+    def watch(
+        self, feed: changes.ChangeFeed, push: Callable[[list[Update]], None]
+    ) -> Callable[[], None]:
+        """Refresh on every change `feed` reports and `push` the updates.
+
+        Changes are applied in the order they arrive, from any thread.
+
+        Returns:
+            A function that stops watching.
+        """
+        loop = asyncio.get_running_loop()
+
+        def refreshed(task: asyncio.Task[list[Update]]) -> None:
+            self.__refreshes.discard(task)
+            if not task.cancelled():
+                push(task.result())
+
+        def changed(change: changes.Change) -> None:
+            task = loop.create_task(self.refresh(change))
+            self.__refreshes.add(task)
+            task.add_done_callback(refreshed)
+
+        return feed.subscribe(lambda change: loop.call_soon_threadsafe(changed, change))
+
+    async def wait(self) -> None:
+        """Wait for the background prefetch to finish."""
+        if self.__prefetch is not None:
+            await asyncio.gather(self.__prefetch, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel every request that has not finished."""
+        self.__cancel_prefetch(keep=set())
+        for task in [*self.__requests.values(), *self.__refreshes]:
+            task.cancel()
+        await asyncio.gather(
+            *self.__requests.values(), *self.__refreshes, return_exceptions=True
+        )
+
+    async def __prefetch_all(self, sources: list[spec.DataSource]) -> None:
+        for source in sources:
+            await self.__load(source, self.__background, prefetch=True)
+
+    def __cancel_prefetch(self, keep: set[tuple[str, str, str]]) -> None:
+        if self.__prefetch is not None:
+            self.__prefetch.cancel()
+            self.__prefetch = None
+        # Requests already running are left to finish for later use; only
+        # those still waiting for a slot are cancelled.
+        for key in self.__prefetching - keep - self.__started:
+            self.__requests.pop(key).cancel()
+        self.__prefetching &= keep | self.__started
+
+    def __needed(self, sources: Iterable[spec.DataSource]) -> set[tuple[str, str, str]]:
+        # Requests of `sources` and of the widgets whose selection they need.
+        # A linked request is only known once its selection has loaded.
+        needed = set()
+        pending = list(sources)
+        while pending:
+            request = self.__request(pending.pop())
+            selection = self.__selection(request)
+            if selection is not None:
+                needed.add(_request_key(request, selection))
+            pending.extend(
+                self.__by_widget[widget_id] for widget_id in request.selections
+            )
+        return needed
+
+    def __selection(self, source: spec.DataSource) -> dict[str, Any] | None:
+        # The selected row of every linked widget, by default its first, or
+        # None until all have loaded.
+        if any(widget_id not in self.results for widget_id in source.selections):
+            return None
+        return {
+            widget_id: self.__selected.get(
+                widget_id, (self.results[widget_id] or [{}])[0]
+            )
+            for widget_id in source.selections
+        }
+
+    def __touches(self, source: spec.DataSource, change: changes.Change) -> bool:
+        if source.kind != "snowflake":
+            return False
+        footprint = changes.footprint(source.template, self.__selection(source))
+        return footprint.touches(change)
+
+    async def __refetch(
+        self, source: spec.DataSource, change: changes.Change | None
+    ) -> Update | None:
+        # Fetches the widget's own request, or only the changed points of a
+        # timeseries, bypassing fusion and any copy older than the change.
+        # None when a selection made meanwhile reloads the widget instead.
+        selection = self.__selection(source)
+        if selection is None:
+            return None
+        delta = (
+            change is not None
+            and change.years is not None
+            and source.widget_type == "timeseries"
+        )
+        request = source
+        if delta:
+            request = replace(
+                source, template=changes.delta_query(source.template, change.years)
+            )
+        rows: Rows = []
+        if all(selection.values()):
+            fetcher = self.fetchers[source.kind]
+            with tracing.span("fetch", refresh=True, **_attributes(request, selection)):
+                queued = time.perf_counter()
+                async with self.__foreground:
+                    tracing.annotate(queue_ms=(time.perf_counter() - queued) * 1000)
+                    self.fetched.append(source.widget_id)
+                    await asyncio.to_thread(fetcher.invalidate, request, selection)
+                    rows = await _fetch(fetcher, request, selection)
+        if (
+            self.__selection(source) != selection
+            or source.widget_id not in self.results
+        ):
+            # Rows for a selection changed meanwhile are not kept.
+            return None
+        self.results[source.widget_id] = (
+            changes.merge(self.results[source.widget_id], rows) if delta else rows
+        )
+        self.loaded_at[source.widget_id] = time.perf_counter()
+        return Update(source.widget_id, rows, delta)
+
+    def __links_to(self, source: spec.DataSource, widget_id: str) -> bool:
+        # Whether `source` depends on `widget_id`'s selection, even indirectly.
+        return any(
+            linked == widget_id or self.__links_to(self.__by_widget[linked], widget_id)
+            for linked in source.selections
+        )
+
+    async def __load(
+        self,
+        source: spec.DataSource,
+        semaphore: asyncio.Semaphore,
+        *,
+        prefetch: bool = False,
+    ) -> Rows:
+        if source.widget_id in self.results:
+            return self.results[source.widget_id]
+        # A fused request needs the selections of every widget in it.
+        request = self.__request(source)
+        selection = self.__selection(request)
+        while selection is None:
+            # A selection made meanwhile drops the linked rows being loaded,
+            # so those load again for the current selection.
+            for widget_id in request.selections:
+                await self.__load(
+                    self.__by_widget[widget_id], semaphore, prefetch=prefetch
+                )
+            selection = self.__selection(request)
+        if request is not source and any(not row for row in selection.values()):
+            # The widget may not link to the empty widget its fused request does.
+            request = source
+            selection = self.__selection(source)
+        if any(not row for row in selection.values()):
+            # Nothing is selected on an empty widget, so there is nothing to fetch.
+            self.results[source.widget_id] = []
+            return []
+        key = _request_key(request, selection)
+        if key not in self.__requests:
+            self.__requests[key] = asyncio.create_task(
+                self.__fetch(request, key, selection, semaphore, prefetch=prefetch)
+            )
+            if prefetch:
+                self.__prefetching.add(key)
+        elif not prefetch:
+            self.__prefetching.discard(key)
+        rows = await asyncio.shield(self.__requests[key])
+        if request is not source:
+            rows = self.__fused[source.widget_id].split(rows)[source.widget_id]
+        own = {widget_id: selection[widget_id] for widget_id in source.selections}
+        if self.__selection(source) == own:
+            # Rows for a selection changed meanwhile are not kept.
+            self.results[source.widget_id] = rows
+            self.loaded_at[source.widget_id] = time.perf_counter()
+        return rows
+
+    def __request(self, source: spec.DataSource) -> spec.DataSource:
+        # The request a widget's rows come from, fused with others or its own.
+        if source.widget_id in self.__fused:
+            return self.__fused[source.widget_id].source
+        return source
+
+    async def __fetch(
+        self,
+        source: spec.DataSource,
+        key: tuple[str, str, str],
+        selection: Selection,
+        semaphore: asyncio.Semaphore,
+        *,
+        prefetch: bool,
+    ) -> Rows:
+        with tracing.span("fetch", prefetch=prefetch, **_attributes(source, selection)):
+            queued = time.perf_counter()
+            async with semaphore:
+                tracing.annotate(queue_ms=(time.perf_counter() - queued) * 1000)
+                self.__started.add(key)
+                self.fetched.append(source.widget_id)
+                return await _fetch(self.fetchers[source.kind], source, selection)
+
+
+async def _fetch(
+    fetcher: Fetcher, source: spec.DataSource, selection: Selection
+) -> Rows:
+    # Runs a request in a worker thread, recording its size on the fetch span.
+    rows = await asyncio.to_thread(fetcher.fetch, source, selection)
+    span = tracing.current()
+    if span is not None:
+        span.attributes["rows"] = len(rows)
+        span.attributes["bytes"] = len(json.dumps(rows, default=str).encode())
+    return rows
+
+
+def _attributes(source: spec.DataSource, selection: Selection) -> dict[str, Any]:
+    # Attributes of a fetch span.
+    values = [selected(selection, *link) for link in source.links]
+    return {
+        "widget": source.widget_id,
+        "kind": source.kind,
+        "slug": source.slug,
+        "query_hash": cache_key(source.slug, source.template, [])[:16],
+        "selection": json.dumps(values, default=str) if values else None,
+    }
+
+
+def _request_key(source: spec.DataSource, selection: Selection) -> tuple[str, str, str]:
+    values = [selected(selection, *link) for link in source.links]
+    return (source.slug, source.template, json.dumps(values, default=str))
+
+
+async def _visit(
+    session: Session, tab: str | None, year: int | None
+) -> tuple[float, float, float | None]:
+    with tracing.span("visit"):
+        start = time.perf_counter()
+        await session.show(tab)
+        first_paint = (time.perf_counter() - start) * 1000
+        await session.wait()
+        loaded = (time.perf_counter() - start) * 1000
+        switched = None
+        if year is not None:
+            row = next(
+                (
+                    row
+                    for row in session.results.get(YEAR_SELECTOR, [])
+                    if row.get("YEAR") == year
+                ),
+                None,
+            )
+            if row is None:
+                await session.close()
+                msg = f"The year selector does not offer {year}."
+                raise LookupError(msg)
+            start = time.perf_counter()
+            await session.select(YEAR_SELECTOR, row)
+            switched = (time.perf_counter() - start) * 1000
+        await session.close()
+    return first_paint, loaded, switched
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Simulate one visit and report time to first paint."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.runtime")
+    parser.add_argument("snapshot", type=Path)
+    parser.add_argument("--tab", help="active tab, default the first")
+    parser.add_argument("--year", type=int, help="switch to this year once loaded")
+    parser.add_argument("--http-base-url", default=WORLD_BANK_API)
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--prefetch-concurrency", type=int, default=1)
+    parser.add_argument("--no-fuse", action="store_true", help="one query per widget")
+    parser.add_argument("--cache", type=Path, help="result cache directory")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL)
+    parser.add_argument("--bundle", type=Path, help="serve from an atlas.export")
+    parser.add_argument("--trace", type=Path, help="append fetch spans to a file")
+    parser.add_argument("--trace-format", choices=("jsonl", "otlp"), default="jsonl")
+    args = parser.parse_args(argv)
+
+    if args.trace is not None:
+        tracing.configure(
+            tracing.OtlpJsonExporter(args.trace)
+            if args.trace_format == "otlp"
+            else tracing.JsonLinesExporter(args.trace)
+        )
+
+    with LocalSnowflake(args.snapshot) as warehouse:
+        fetchers: dict[str, Fetcher] = {"snowflake": WarehouseFetcher(warehouse)}
+        if not args.skip_http:
+            fetchers["http"] = HttpFetcher(args.http_base_url)
+        if args.bundle is not None:
+            from atlas.export import BundleFetcher
+
+            bundle = BundleFetcher(args.bundle)
+            fetchers = {kind: bundle for kind in fetchers}
+        cache = None
+        if args.cache is not None:
+            cache = ResultCache(args.cache, ttl=args.cache_ttl)
+            fetchers = {
+                kind: CachingFetcher(fetcher, cache)
+                for kind, fetcher in fetchers.items()
+            }
+
+        async def visit() -> tuple[Session, float, float, float | None]:
+            session = Session(
+                fetchers,
+                concurrency=args.concurrency,
+                prefetch_concurrency=args.prefetch_concurrency,
+                # A bundle holds each widget's own rows.
+                fuse=not args.no_fuse and args.bundle is None,
+            )
+            tab = args.tab or session.tabs[0]
+            if tab not in session.tabs:
+                parser.error(f"unknown tab {tab!r}, expected one of {session.tabs}")
+            return session, *await _visit(session, tab, args.year)
+
+        try:
+            session, first_paint, loaded, switched = asyncio.run(visit())
+        except LookupError as error:
+            parser.error(str(error))
+        if cache is not None:
+            cache.close()
+    tracing.configure(None)
+    sys.stdout.write(
+        f"first paint {first_paint:.1f} ms, all tabs {loaded:.1f} ms\n"
+        f"fetch order: {', '.join(session.fetched)}\n"
+    )
+    if switched is not None:
+        sys.stdout.write(f"switched to {args.year} in {switched:.1f} ms\n")
+    if cache is not None:
+        sys.stdout.write(
+            f"cache: {cache.hits} hits, {cache.stale_hits} stale, "
+            f"{cache.misses} misses\n"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Server-side pages of the overview table.
+
+Serves `general_overview` one page at a time instead of the whole country
+pivot: a search narrows the rows through `WORLD_BANK_SEARCH_INDEX`, the sort
+runs on any overview column in the warehouse, and only `limit` rows come back
+with the total number of matches. Text of three or more characters matches
+countries whose name or region contains it; shorter text matches name or
+region prefixes.
+
+Usage:
+    python -m atlas.search SNAPSHOT_DIR [TEXT] [--sort GDP_PER_CAPITA --desc]
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from atlas.models import INDICATORS
+from atlas.models import SEARCH_TEXT_LENGTH
+from atlas.warehouse import LocalSnowflake
+
+TEXT_COLUMNS = ("COUNTRY_NAME", "REGION")
+
+COLUMNS = (*TEXT_COLUMNS, *INDICATORS)
+
+PAGE_SIZE = 10
+
+
+@dataclass
+class Page:
+    """One page of overview rows."""
+
+    rows: list[dict[str, Any]]
+    total: int
+    offset: int
+
+
+def terms(text: str) -> list[str]:
+    """Index terms every match of `text` holds."""
+    text = text.lower()[:SEARCH_TEXT_LENGTH]
+    if len(text) < 3:
+        return [text] if text else []
+    return sorted({text[start : start + 3] for start in range(len(text) - 2)})
+
+
+def page(
+    warehouse: LocalSnowflake,
+    text: str = "",
+    *,
+    year: int = 2020,
+    sort: str = "COUNTRY_NAME",
+    descending: bool = False,
+    offset: int = 0,
+    limit: int = PAGE_SIZE,
+) -> Page:
+    """Fetch one page of the overview table.
+
+    Args:
+        warehouse: warehouse holding the models.
+        text: search text, empty for every row.
+        year: year shown in the table.
+        sort: overview column to sort by.
+        descending: sort from largest to smallest.
+        offset: index of the first row of the page.
+        limit: rows per page.
+    """
+    if sort not in COLUMNS:
+        msg = f"Cannot sort by {sort!r}, expected one of {', '.join(COLUMNS)}."
+        raise ValueError(msg)
+    parameters: list[Any] = [year]
+    matches = ""
+    search_terms = terms(text)
+    if search_terms:
+        matches = """
+            AND COUNTRY_CODE IN (
+                SELECT COUNTRY_CODE FROM WORLD_BANK_SEARCH_INDEX
+                WHERE YEAR = ? AND list_contains(?, TERM)
+                GROUP BY COUNTRY_CODE
+                HAVING COUNT(*) = ?
+            )"""
+        parameters += [year, search_terms, len(search_terms)]
+        if len(text) >= 3:
+            # Trigrams can all occur without the text itself occurring.
+            matches += """
+            AND (CONTAINS(LOWER(COUNTRY_NAME), ?) OR CONTAINS(LOWER(REGION), ?))"""
+            parameters += [text.lower(), text.lower()]
+    rows_query = f"""
+        FROM WORLD_BANK_COUNTRY_YEAR
+        WHERE YEAR = ? AND COUNTRY_CODE != '1W' AND REGION IS NOT NULL{matches}
+    """
+    cursor = warehouse.connection.execute(
+        f"""
+        SELECT {", ".join(COLUMNS)}, COUNT(*) OVER () AS TOTAL
+        {rows_query}
+        ORDER BY {sort} {"DESC" if descending else "ASC"} NULLS LAST, COUNTRY_NAME
+        LIMIT ? OFFSET ?
+        """,
+        [*parameters, limit, offset],
+    )
+    columns = [column[0].upper() for column in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    if rows:
+        total = rows[0]["TOTAL"]
+        for row in rows:
+            del row["TOTAL"]
+    elif offset:
+        # Past the last match the window count has no row to ride on.
+        total = warehouse.connection.execute(
+            f"SELECT COUNT(*) {rows_query}", parameters
+        ).fetchone()[0]
+    else:
+        total = 0
+    return Page(rows=rows, total=total, offset=offset)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Print one page of the overview table."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.search")
+    parser.add_argument("snapshot", type=Path)
+    parser.add_argument("text", nargs="?", default="")
+    parser.add_argument("--year", type=int, default=2020)
+    parser.add_argument("--sort", choices=COLUMNS, default="COUNTRY_NAME")
+    parser.add_argument("--desc", action="store_true")
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    args = parser.parse_args(argv)
+
+    with LocalSnowflake(args.snapshot) as warehouse:
+        start = time.perf_counter()
+        result = page(
+            warehouse,
+            args.text,
+            year=args.year,
+            sort=args.sort,
+            descending=args.desc,
+            offset=(args.page - 1) * args.page_size,
+            limit=args.page_size,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+    for row in result.rows:
+        sys.stdout.write(
+            f"{row['COUNTRY_NAME']:<30} {row['REGION']:<30} {row[args.sort]}\n"
+        )
+    sys.stdout.write(
+        f"rows {result.offset + 1}-{result.offset + len(result.rows)} "
+        f"of {result.total} in {elapsed:.1f} ms\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
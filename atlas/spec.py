@@ -0,0 +1,116 @@
+"""Data sources declared by the built dashboard spec."""
+
+import re
+import urllib.parse
+from collections.abc import Iterator
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import cache
+from typing import Any
+
+from engineai.sdk.dashboard.dashboard.page.page import Page
+
+DASHBOARD_SLUG = "demo-dashboard"
+
+TEMPLATE_LINK = re.compile(r"\{\{\s*([A-Za-z0-9_]+)\.0\.([A-Za-z0-9_]+)\s*\}\}")
+
+
+@dataclass(frozen=True)
+class DataSource:
+    """A connector request issued by one widget."""
+
+    widget_id: str
+    kind: str
+    slug: str
+    template: str
+    tab: str | None = None
+    widget_type: str | None = None
+
+    @property
+    def links(self) -> list[tuple[str, str]]:
+        """`(widget_id, column)` pairs interpolated into the template."""
+        return TEMPLATE_LINK.findall(self.template)
+
+    @property
+    def selections(self) -> list[str]:
+        """Ids of the widgets whose selection this request depends on."""
+        return list(dict.fromkeys(widget_id for widget_id, _ in self.links))
+
+
+def http_path(template: str, selection: Mapping[str, Mapping[str, Any]]) -> str:
+    """An `HttpGet` path with its links replaced by the selected values."""
+
+    def value(match: re.Match[str]) -> str:
+        widget_id, column = match.groups()
+        try:
+            return urllib.parse.quote(str(selection[widget_id][column]), safe="")
+        except KeyError:
+            msg = f"No selection for {widget_id}.{column}."
+            raise KeyError(msg) from None
+
+    return TEMPLATE_LINK.sub(value, template)
+
+
+def build_spec(page: Page, dashboard_slug: str = DASHBOARD_SLUG) -> dict[str, Any]:
+    """Prepare, validate and build a page without publishing it.
+
+    `Page.prepare` is not idempotent, so build each page once and reuse the spec.
+    """
+    page.prepare(dashboard_slug=dashboard_slug)
+    page.validate()
+    return page.build()
+
+
+@cache
+def load() -> list[DataSource]:
+    """Data sources of the dashboard defined in `dashboard.py`."""
+    import dashboard
+
+    return data_sources(build_spec(dashboard.page))
+
+
+def data_sources(spec: dict[str, Any]) -> list[DataSource]:
+    """Collect every connector request in a built spec, in layout order."""
+    return [
+        _data_source(widget, dependency, tab)
+        for widget, tab in _widgets(spec, tab=None)
+        for dependency in widget["dependencies"]
+        if "snowflake" in dependency or "httpDataConnector" in dependency
+    ]
+
+
+def _data_source(
+    widget: dict[str, Any],
+    dependency: dict[str, Any],
+    tab: str | None,
+) -> DataSource:
+    if "snowflake" in dependency:
+        kind, body = "snowflake", dependency["snowflake"]
+        template = body["query"]["template"]
+    else:
+        kind, body = "http", dependency["httpDataConnector"]
+        template = body["path"]["template"]
+    return DataSource(
+        widget_id=widget["widgetId"],
+        kind=kind,
+        slug=body["dataConnectorSlug"],
+        template=template,
+        tab=tab,
+        widget_type=next(iter(widget["widgetType"]), None),
+    )
+
+
+def _widgets(node: Any, tab: str | None) -> Iterator[tuple[dict[str, Any], str | None]]:
+    if isinstance(node, list):
+        for item in node:
+            yield from _widgets(item, tab)
+    elif isinstance(node, dict):
+        if "widgetId" in node and "widgetType" in node:
+            yield node, tab
+            return
+        if "tabSection" in node:
+            for option in node["tabSection"]["options"]:
+                yield from _widgets(option["item"], option["label"]["template"])
+            return
+        for value in node.values():
+            yield from _widgets(value, tab)
@@ -0,0 +1,343 @@
+"""Tracing spans for data source fetches, with pluggable exporters.
+
+`configure` installs a tracer; until then `span` and `annotate` cost almost
+nothing. Spans nest through a context variable, so asyncio tasks and
+`asyncio.to_thread` calls started inside a span become its children. The
+runtime emits:
+
+    visit / show / select        one user action of `atlas.runtime.Session`
+    fetch                        one data source request: widget ids, kind,
+                                 connector slug, query hash, selection values,
+                                 prefetch, queue wait, rows, payload bytes and
+                                 `cache` (hit, stale or miss, when cached)
+    stream                       a streamed widget result: the fetch
+                                 attributes, time to the first chunk, chunks
+    warehouse.execute            a query on the warehouse: lock wait, rows
+    http.get                     an API request: path, status, attempts,
+                                 bytes, or `coalesced` when it joined another
+
+Exporters write finished spans in batches: `JsonLinesExporter` one span per
+line, `OtlpJsonExporter` OTLP/JSON `ExportTraceServiceRequest` lines as read by
+the OpenTelemetry Collector's `otlpjsonfile` receiver.
+
+Usage:
+    python -m atlas.runtime SNAPSHOT_DIR --trace spans.jsonl
+    python -m atlas.tracing spans.jsonl [--top 10]
+"""
+
+import argparse
+import json
+import random
+import secrets
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from collections.abc import Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Any
+from typing import Protocol
+
+SERVICE_NAME = "world-bank-atlas"
+
+
+@dataclass
+class Span:
+    """One timed operation."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+    sampled: bool = True
+
+    @property
+    def duration_ms(self) -> float:
+        """Duration in milliseconds, up to now while the span is open."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class Exporter(Protocol):
+    """Receives finished spans."""
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Write a batch of spans."""
+
+    def close(self) -> None:
+        """Release the sink."""
+
+
+class JsonLinesExporter:
+    """Appends one JSON object per span to a file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.file = Path(path).open("a", encoding="utf-8")  # noqa: SIM115
+
+    def export(self, spans: Sequence[Span]) -> None:
+        for span in spans:
+            record = asdict(span)
+            del record["sampled"]
+            self.file.write(json.dumps(record, default=str) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class OtlpJsonExporter:
+    """Appends each batch as an OTLP/JSON `ExportTraceServiceRequest` line."""
+
+    def __init__(self, path: str | Path, *, service_name: str = SERVICE_NAME) -> None:
+        self.file = Path(path).open("a", encoding="utf-8")  # noqa: SIM115
+        self.service_name = service_name
+
+    def export(self, spans: Sequence[Span]) -> None:
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "atlas"},
+                            "spans": [_otlp_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        self.file.write(json.dumps(request) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": 2, "message": span.error} if span.error else {},
+    }
+    if span.parent_id is not None:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, list | tuple):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """Collects finished spans and hands them to an exporter in batches.
+
+    Args:
+        exporter: sink of finished spans.
+        sample_rate: share of traces kept, decided at each root span.
+        batch_size: spans buffered before they are exported.
+    """
+
+    def __init__(
+        self, exporter: Exporter, *, sample_rate: float = 1.0, batch_size: int = 64
+    ) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.__finished: list[Span] = []
+        self.__lock = threading.Lock()
+
+    def finish(self, span: Span) -> None:
+        """Record a finished span."""
+        if not span.sampled:
+            return
+        with self.__lock:
+            self.__finished.append(span)
+            if len(self.__finished) < self.batch_size:
+                return
+            batch, self.__finished = self.__finished, []
+            self.exporter.export(batch)
+
+    def flush(self) -> None:
+        """Export the spans buffered so far."""
+        with self.__lock:
+            batch, self.__finished = self.__finished, []
+            if batch:
+                self.exporter.export(batch)
+
+    def close(self) -> None:
+        """Flush and close the exporter."""
+        self.flush()
+        self.exporter.close()
+
+
+_tracer: Tracer | None = None
+
+_current: ContextVar[Span | None] = ContextVar("atlas_span", default=None)
+
+
+def configure(exporter: Exporter | None, **options: Any) -> Tracer | None:
+    """Install a tracer for `exporter`, or none; closes the previous one.
+
+    Args:
+        exporter: sink of finished spans, None to stop tracing.
+        **options: passed to `Tracer`.
+    """
+    global _tracer
+    previous, _tracer = _tracer, None
+    if previous is not None:
+        previous.close()
+    if exporter is not None:
+        _tracer = Tracer(exporter, **options)
+    return _tracer
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Time the enclosed block as a child of the current span.
+
+    Yields None when tracing is off.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield None
+        return
+    parent = _current.get()
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+        attributes=attributes,
+        sampled=(parent.sampled if parent else random.random() < tracer.sample_rate),
+    )
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as error:
+        current.error = f"{type(error).__name__}: {error}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        tracer.finish(current)
+
+
+def current() -> Span | None:
+    """The innermost open span, None when tracing is off or outside any."""
+    return _current.get()
+
+
+def annotate(**attributes: Any) -> None:
+    """Add attributes to the current span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def read(path: str | Path) -> list[dict[str, Any]]:
+    """Spans of a file written by either exporter, as JSON lines records."""
+    spans = []
+    for line in Path(path).read_text().splitlines():
+        record = json.loads(line)
+        if "resourceSpans" not in record:
+            spans.append(record)
+            continue
+        for resource in record["resourceSpans"]:
+            for scope in resource["scopeSpans"]:
+                spans.extend(
+                    {
+                        "name": otlp["name"],
+                        "start_ns": int(otlp["startTimeUnixNano"]),
+                        "end_ns": int(otlp["endTimeUnixNano"]),
+                        "attributes": {
+                            attribute["key"]: next(iter(attribute["value"].values()))
+                            for attribute in otlp["attributes"]
+                        },
+                        "error": otlp["status"].get("message"),
+                    }
+                    for otlp in scope["spans"]
+                )
+    return spans
+
+
+def report(spans: list[dict[str, Any]], *, top: int = 10) -> str:
+    """Fetch latency per widget, then the slowest fetches."""
+    fetches = [record for record in spans if record["name"] == "fetch"]
+    by_widget: dict[str, list[float]] = defaultdict(list)
+    for record in fetches:
+        record["ms"] = (record["end_ns"] - record["start_ns"]) / 1e6
+        by_widget[record["attributes"].get("widget", "?")].append(record["ms"])
+    lines = [f"{'widget':<45} {'fetches':>8} {'p50':>8} {'p95':>8} {'max':>8}"]
+    for widget, samples in sorted(by_widget.items(), key=lambda item: -max(item[1])):
+        p95 = (
+            statistics.quantiles(samples, n=20, method="inclusive")[18]
+            if len(samples) > 1
+            else samples[0]
+        )
+        lines.append(
+            f"{widget:<45} {len(samples):>8} {statistics.median(samples):>8.1f} "
+            f"{p95:>8.1f} {max(samples):>8.1f}"
+        )
+    lines.append(f"\nslowest {top} fetches")
+    for record in sorted(fetches, key=lambda record: -record["ms"])[:top]:
+        attributes = record["attributes"]
+        lines.append(
+            f"{record['ms']:>8.1f} ms  {attributes.get('widget')}  "
+            f"queued {attributes.get('queue_ms', 0):.1f} ms  "
+            f"rows {attributes.get('rows')}  bytes {attributes.get('bytes')}  "
+            f"cache {attributes.get('cache', '-')}  "
+            f"selection {attributes.get('selection')}"
+            + (f"  error {record['error']}" if record.get("error") else "")
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Summarize a span file by widget."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.tracing")
+    parser.add_argument("spans", type=Path)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    sys.stdout.write(report(read(args.spans), top=args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
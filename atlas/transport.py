@@ -0,0 +1,178 @@
+"""Columnar wire format for Snowflake widget results.
+
+Results are sent as an Arrow IPC stream instead of JSON records: numbers keep
+their typed buffers and every string column is dictionary-encoded, so a value
+such as a region name is sent once however many rows repeat it. Buffers can
+additionally be compressed with zstd or lz4. Decoding maps the buffers
+without parsing rows, and string columns stay dictionary-encoded.
+
+`encode_batches` writes the same stream one record batch at a time, as the
+warehouse produces them, each with its own dictionaries. The client gets the
+first rows after the first batch, and the serializer only ever holds one.
+
+Usage:
+    python -m atlas.transport SNAPSHOT_DIR [WIDGET ...] [--compression zstd]
+        [--batch-rows 8192]
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from atlas import spec
+from atlas.warehouse import BATCH_ROWS
+from atlas.warehouse import LocalSnowflake
+
+CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+
+COMPRESSIONS = ("zstd", "lz4")
+
+
+def columnar(table: pa.Table) -> pa.Table:
+    """Dictionary-encode every string column of a result."""
+    columns = [
+        pc.dictionary_encode(column) if _is_string(column.type) else column
+        for column in table.columns
+    ]
+    return pa.table(columns, names=table.column_names)
+
+
+def columnar_schema(schema: pa.Schema) -> pa.Schema:
+    """Schema of `schema`'s results once `columnar` encoded them."""
+    return pa.schema(
+        field.with_type(pa.dictionary(pa.int32(), field.type))
+        if _is_string(field.type)
+        else field
+        for field in schema
+    )
+
+
+def _is_string(type_: pa.DataType) -> bool:
+    return pa.types.is_string(type_) or pa.types.is_large_string(type_)
+
+
+def encode(table: pa.Table, compression: str | None = None) -> bytes:
+    """Serialize a result as a dictionary-encoded Arrow IPC stream.
+
+    Args:
+        table: widget result.
+        compression: buffer compression, one of `COMPRESSIONS`, or None.
+    """
+    table = columnar(table)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_batches(
+    reader: pa.RecordBatchReader, compression: str | None = None
+) -> Iterator[bytes]:
+    """Serialize a result batch by batch as it is read.
+
+    The chunks concatenated are one stream `decode` reads. A batch is only
+    read from `reader` once the previous chunk was consumed.
+
+    Args:
+        reader: widget result, such as `LocalSnowflake.fetch_batches` returns.
+        compression: buffer compression, one of `COMPRESSIONS`, or None.
+    """
+    schema = columnar_schema(reader.schema)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema, options=options) as writer:
+        for batch in reader:
+            columns = [
+                pc.dictionary_encode(column) if _is_string(column.type) else column
+                for column in batch.columns
+            ]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            yield _drain(sink)
+    yield _drain(sink)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    # What the writer wrote since the last chunk.
+    chunk = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return chunk
+
+
+def decode(payload: bytes) -> pa.Table:
+    """Read a result written by `encode`, or all chunks of `encode_batches`."""
+    return pa.ipc.open_stream(payload).read_all()
+
+
+def _json_records(rows: list[dict[str, Any]]) -> bytes:
+    return json.dumps(rows, default=str).encode()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Compare JSON records with the columnar format for each widget.
+
+    Also streams each result in batches and reports the time until the first
+    chunk and the largest chunk held.
+    """
+    parser = argparse.ArgumentParser(prog="python -m atlas.transport")
+    parser.add_argument("snapshot", type=Path)
+    parser.add_argument("widgets", nargs="*", help="widget names, default all")
+    parser.add_argument("--compression", choices=COMPRESSIONS)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    args = parser.parse_args(argv)
+
+    sys.stdout.write(
+        f"{'widget':<25} {'rows':>5} {'json':>9} {'arrow':>9} "
+        f"{'json ms':>8} {'arrow ms':>8} {'chunks':>6} {'largest':>9} "
+        f"{'first ms':>8} {'all ms':>8}\n"
+    )
+    selection: dict[str, dict[str, Any]] = {}
+    with LocalSnowflake(args.snapshot) as warehouse:
+        for source in spec.load():
+            if source.kind != "snowflake":
+                continue
+            rows = warehouse.execute(source.template, selection)
+            if rows:
+                selection.setdefault(source.widget_id, rows[0])
+            if args.widgets and source.widget_id not in args.widgets:
+                continue
+            records = _json_records(rows)
+            payload = encode(
+                warehouse.fetch_arrow(source.template, selection), args.compression
+            )
+            start = time.perf_counter()
+            json.loads(records)
+            json_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            decode(payload)
+            arrow_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            chunks = []
+            first_ms = None
+            reader = warehouse.fetch_batches(
+                source.template, selection, batch_rows=args.batch_rows
+            )
+            for chunk in encode_batches(reader, args.compression):
+                if first_ms is None:
+                    first_ms = (time.perf_counter() - start) * 1000
+                chunks.append(len(chunk))
+            all_ms = (time.perf_counter() - start) * 1000
+            sys.stdout.write(
+                f"{source.widget_id:<25} {len(rows):>5} {len(records):>9} "
+                f"{len(payload):>9} {json_ms:>8.2f} {arrow_ms:>8.2f} "
+                f"{len(chunks):>6} {max(chunks):>9} {first_ms:>8.2f} {all_ms:>8.2f}\n"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
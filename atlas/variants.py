@@ -0,0 +1,192 @@
+"""Build and publish many copies of the atlas from `atlas.params.AtlasParams`.
+
+Variants are built and validated in a process pool, then published by a
+thread pool with at most `--publish-concurrency` requests to the platform in
+flight, each through `atlas.publish.publish_spec`, so unchanged variants are
+skipped. A variant that fails to build stops the run before anything is
+published.
+
+Variants are read from a JSON file holding a list of `AtlasParams` fields, or
+default to the global atlas followed by one copy per World Bank region.
+
+Usage:
+    python -m atlas.variants [VARIANTS_JSON] [--workers 4] [--dry-run]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+from atlas.params import AtlasParams
+from atlas.publish import STATE_FILE
+from atlas.publish import publish_spec
+from atlas.spec import build_spec
+
+REGIONS = (
+    "East Asia & Pacific",
+    "Europe & Central Asia",
+    "Latin America & Caribbean",
+    "Middle East, North Africa, Afghanistan & Pakistan",
+    "North America",
+    "South Asia",
+    "Sub-Saharan Africa",
+)
+
+
+def region_variants(base: AtlasParams | None = None) -> list[AtlasParams]:
+    """`base` followed by one copy of it per region."""
+    base = base or AtlasParams()
+    return [
+        base,
+        *(
+            replace(
+                base,
+                title=f"{base.title}: {region}",
+                region=region,
+                slug=f"{base.slug}-{_slug(region)}",
+            )
+            for region in REGIONS
+        ),
+    ]
+
+
+def load(path: Path) -> list[AtlasParams]:
+    """Variants listed in a JSON file."""
+    return [
+        AtlasParams(**{**fields, "tabs": tuple(fields.get("tabs", AtlasParams.tabs))})
+        for fields in json.loads(path.read_text())
+    ]
+
+
+def build(params: AtlasParams) -> dict[str, Any]:
+    """Build and validate the spec of one variant."""
+    import dashboard
+
+    return build_spec(dashboard.build_page(params), params.slug)
+
+
+def build_all(
+    variants: Sequence[AtlasParams], *, workers: int | None = None
+) -> list[dict[str, Any]]:
+    """Build every variant, in a pool of `workers` processes.
+
+    Raises:
+        ValueError: two variants would be published to the same dashboard.
+    """
+    targets = [_target(params) for params in variants]
+    duplicates = sorted({t for t in targets if targets.count(t) > 1})
+    if duplicates:
+        msg = f"Several variants publish to {', '.join(duplicates)}."
+        raise ValueError(msg)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [build(params) for params in variants]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(build, variants))
+
+
+def publish_all(
+    variants: Sequence[AtlasParams],
+    specs: Sequence[dict[str, Any]],
+    *,
+    concurrency: int = 8,
+    **options: Any,
+) -> dict[str, str | None]:
+    """Publish built variants with at most `concurrency` publishes at once.
+
+    Args:
+        variants: variants in the order of `specs`.
+        specs: specs returned by `build_all`.
+        concurrency: publishes in flight.
+        **options: passed to `atlas.publish.publish_spec`.
+
+    Returns:
+        The version published per `workspace/app/dashboard` slug, None when
+        unchanged.
+
+    Raises:
+        RuntimeError: some variants failed to publish, once all have finished.
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {
+            _target(params): pool.submit(
+                publish_spec,
+                spec,
+                workspace_slug=params.workspace_slug,
+                app_slug=params.app_slug,
+                slug=params.slug,
+                prefix=f"{params.slug}: ",
+                **options,
+            )
+            for params, spec in zip(variants, specs)
+        }
+    failures = {
+        slug: future.exception()
+        for slug, future in futures.items()
+        if future.exception() is not None
+    }
+    if failures:
+        msg = "Failed to publish " + ", ".join(
+            f"{slug} ({error})" for slug, error in failures.items()
+        )
+        raise RuntimeError(msg) from next(iter(failures.values()))
+    return {slug: future.result() for slug, future in futures.items()}
+
+
+def _target(params: AtlasParams) -> str:
+    # The dashboard a variant publishes to, unique across workspaces and apps.
+    return f"{params.workspace_slug}/{params.app_slug}/{params.slug}"
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Build every variant, then publish those that changed."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.variants")
+    parser.add_argument("variants", type=Path, nargs="?", help="default: per region")
+    parser.add_argument("--workers", type=int, help="build processes, default CPUs")
+    parser.add_argument("--publish-concurrency", type=int, default=8)
+    parser.add_argument("--state", type=Path, default=STATE_FILE)
+    parser.add_argument("--force", action="store_true", help="publish unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="only list changes")
+    parser.add_argument("--no-activate", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.variants is not None:
+        variants = load(args.variants)
+    else:
+        variants = region_variants(
+            AtlasParams(
+                workspace_slug=os.environ.get("WORKSPACE_SLUG", "demo-workspace"),
+                app_slug=os.environ.get("APP_SLUG", "demo-app"),
+                slug=os.environ.get("DASHBOARD_SLUG", "demo-dashboard"),
+            )
+        )
+    specs = build_all(variants, workers=args.workers)
+    sys.stdout.write(f"Built and validated {len(specs)} variants.\n")
+    versions = publish_all(
+        variants,
+        specs,
+        concurrency=args.publish_concurrency,
+        activate=not args.no_activate,
+        state_file=args.state,
+        force=args.force,
+        dry_run=args.dry_run,
+    )
+    published = sum(version is not None for version in versions.values())
+    sys.stdout.write(f"Published {published} of {len(versions)} variants.\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
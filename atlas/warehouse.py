@@ -0,0 +1,437 @@
+"""DuckDB stand-in for the `snowflake-world-bank-connector` Snowflake connector.
+
+The warehouse tables are loaded from a snapshot directory holding one file per
+table, either Arrow IPC (`<TABLE>.arrow`) or Parquet (`<TABLE>.parquet`), both
+memory-mapped, and the derived tables in `atlas.models` are materialized on top.
+Widget queries run unchanged: Snowflake-only syntax is translated on the way in
+and result columns are upper-cased the way Snowflake folds unquoted identifiers.
+
+Each query template is prepared once, with its `{{widget.0.COLUMN}}` selection
+links turned into positional parameters, and executed again for every
+selection; selected values never become part of the statement text.
+`fetch_batches` streams a result in record batches of `BATCH_ROWS` rows, so a
+large result never has to be held in memory at once.
+
+Tables keep the layout of the live warehouse (`atlas.models`): snapshots and
+appends store the indicator rows as one record batch per year, ordered by
+indicator within it (`partition_by_year`), and the models are materialized in
+clustering order, `YEAR` first, so DuckDB's min/max statistics skip the row
+groups of other years.
+
+Usage:
+    python -m atlas.warehouse SNAPSHOT_DIR [WIDGET ...]
+"""
+
+import argparse
+import datetime
+import hashlib
+import math
+import os
+import re
+import sys
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Mapping
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+from typing import Self
+
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from atlas import models
+from atlas import spec
+
+SLUG = "snowflake-world-bank-connector"
+
+TABLES = ("WORLD_BANK_INDICATORS", "WORLD_BANK_COUNTRIES")
+
+Selection = Mapping[str, Mapping[str, Any]]
+
+# Rows per record batch of a streamed result, four DuckDB vectors.
+BATCH_ROWS = 8192
+
+# Widgets only format dates as 'YYYY-MM-DD', which DuckDB casts natively.
+_MACROS = (
+    "CREATE MACRO TO_DATE(value, format) AS CAST(CAST(value AS VARCHAR) AS DATE)",
+)
+
+_DIALECT = (
+    (
+        re.compile(r"DATE_PART\(\s*EPOCH_SECOND\s*,", re.IGNORECASE),
+        "DATE_PART('epoch',",
+    ),
+    # DuckDB's TO_JSON takes a row by its relation name.
+    (
+        re.compile(r"OBJECT_CONSTRUCT_KEEP_NULL\(\s*(\w+)\.\*\s*\)", re.IGNORECASE),
+        r"\1",
+    ),
+)
+
+
+class LocalSnowflake:
+    """Runs Snowflake widget queries against a local snapshot."""
+
+    def __init__(self, snapshot: str | Path, *, slug: str = SLUG) -> None:
+        """Constructor for LocalSnowflake class.
+
+        Args:
+            snapshot: directory holding one Arrow or Parquet file per table.
+            slug: slug of the connector this instance stands in for.
+        """
+        self.slug = slug
+        self.snapshot = Path(snapshot)
+        self.connection = duckdb.connect()
+        self.__statements: dict[str, tuple[str, list[tuple[str, str]]]] = {}
+        self.__fingerprint = _fingerprint(self.snapshot)
+        self.__appends = 0
+        self.__subscribers: list[Callable[[str, pa.Table], None]] = []
+        self.tables = {table: read_table(self.snapshot, table) for table in TABLES}
+        for table, data in self.tables.items():
+            self.connection.register(table, data)
+        for macro in _MACROS:
+            self.connection.execute(macro)
+        self.refresh()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying DuckDB connection."""
+        self.connection.close()
+
+    @property
+    def version(self) -> str:
+        """Version of the tables, changed by any write to the snapshot or `append`."""
+        return f"{self.__fingerprint}-{self.__appends}"
+
+    def execute(
+        self, query: str, selection: Selection | None = None
+    ) -> list[dict[str, Any]]:
+        """Run a widget query and return its rows as records.
+
+        Args:
+            query: query template, as declared on the widget's `Snowflake` data.
+            selection: selected row per widget id, bound to the `{{...}}` links.
+        """
+        cursor = self.__execute(query, selection)
+        columns = [column[0].upper() for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def fetch_arrow(self, query: str, selection: Selection | None = None) -> pa.Table:
+        """Run a widget query and return its result as an Arrow table.
+
+        Takes the same arguments as `execute`.
+        """
+        result = self.__execute(query, selection).fetch_arrow_table()
+        return result.rename_columns([name.upper() for name in result.column_names])
+
+    def fetch_batches(
+        self,
+        query: str,
+        selection: Selection | None = None,
+        *,
+        batch_rows: int = BATCH_ROWS,
+    ) -> pa.RecordBatchReader:
+        """Run a widget query and read its result batch by batch.
+
+        Batches are computed as they are read, so reading slowly holds the
+        query back. The connection runs nothing else until the reader is
+        exhausted or closed.
+
+        Args:
+            query: query template, as declared on the widget's `Snowflake` data.
+            selection: selected row per widget id, bound to the `{{...}}` links.
+            batch_rows: rows per batch.
+        """
+        reader = self.__execute(query, selection).to_arrow_reader(batch_rows)
+        names = [name.upper() for name in reader.schema.names]
+        return pa.RecordBatchReader.from_batches(
+            pa.schema(
+                field.with_name(name) for field, name in zip(reader.schema, names)
+            ),
+            (batch.rename_columns(names) for batch in reader),
+        )
+
+    def subscribe(
+        self, callback: Callable[[str, pa.Table], None]
+    ) -> Callable[[], None]:
+        """Call `callback` with the table and rows of every `append`.
+
+        Callbacks run in the appending thread, once the models are refreshed.
+
+        Returns:
+            A function cancelling the subscription.
+        """
+        self.__subscribers.append(callback)
+        return lambda: self.__subscribers.remove(callback)
+
+    def append(self, table: str, rows: pa.Table) -> None:
+        """Append rows to a base table and refresh the models built on it.
+
+        New indicator rows only refresh the years they belong to; a change to
+        the countries table refreshes every model in full. Subscribers are
+        told once the models are up to date.
+        """
+        current = self.tables[table]
+        self.tables[table] = _partitioned(
+            table,
+            pa.concat_tables(
+                [current, rows.select(current.schema.names).cast(current.schema)]
+            ),
+        )
+        self.connection.unregister(table)
+        self.connection.register(table, self.tables[table])
+        self.__appends += 1
+        years = None
+        if table == "WORLD_BANK_INDICATORS":
+            years = set(rows.column("YEAR").to_pylist())
+        self.refresh(years)
+        for callback in list(self.__subscribers):
+            callback(table, rows)
+
+    def refresh(self, years: Iterable[int] | None = None) -> None:
+        """Recompute the models, limited to `years` when given."""
+        years = None if years is None else sorted(years)
+        self.__deallocate()
+        self.connection.execute("BEGIN TRANSACTION")
+        for model in models.MODELS:
+            query = translate(model.query)
+            # Rows are stored in clustering order so DuckDB's per-row-group
+            # min/max statistics prune lookups on the clustering keys.
+            order_by = ""
+            if model.cluster_by:
+                order_by = f" ORDER BY {', '.join(model.cluster_by)}"
+            if years is None:
+                self.connection.execute(
+                    f"CREATE OR REPLACE TABLE {model.name} AS "
+                    f"SELECT * FROM ({query}){order_by}"
+                )
+                continue
+            self.connection.execute(
+                f"DELETE FROM {model.name} WHERE list_contains(?, YEAR)", [years]
+            )
+            self.connection.execute(
+                f"INSERT INTO {model.name} "
+                f"SELECT * FROM ({query}) WHERE list_contains(?, YEAR){order_by}",
+                [years],
+            )
+        self.connection.execute("COMMIT")
+
+    def __execute(
+        self, query: str, selection: Selection | None
+    ) -> duckdb.DuckDBPyConnection:
+        statement, links = self.__prepare(query)
+        arguments = ", ".join(
+            _literal(selected(selection or {}, widget_id, column))
+            for widget_id, column in links
+        )
+        if arguments:
+            statement += f"({arguments})"
+        return self.connection.execute(f"EXECUTE {statement}")
+
+    def __prepare(self, query: str) -> tuple[str, list[tuple[str, str]]]:
+        if query not in self.__statements:
+            statement = f"widget_query_{len(self.__statements)}"
+            sql, links = parameterize(query)
+            self.connection.execute(f"PREPARE {statement} AS {translate(sql)}")
+            self.__statements[query] = (statement, links)
+        return self.__statements[query]
+
+    def __deallocate(self) -> None:
+        for statement, _ in self.__statements.values():
+            self.connection.execute(f"DEALLOCATE {statement}")
+        self.__statements.clear()
+
+
+def read_table(snapshot: str | Path, table: str) -> pa.Table:
+    """Memory-map one table of a snapshot directory."""
+    snapshot = Path(snapshot)
+    arrow = snapshot / f"{table}.arrow"
+    if arrow.exists():
+        with pa.memory_map(str(arrow)) as source:
+            return pa.ipc.open_file(source).read_all()
+    parquet = snapshot / f"{table}.parquet"
+    if parquet.exists():
+        return pq.read_table(parquet, memory_map=True)
+    msg = f"Snapshot {snapshot} has no {table}.arrow or {table}.parquet."
+    raise FileNotFoundError(msg)
+
+
+def _fingerprint(snapshot: Path) -> str:
+    # Snapshot files are only ever replaced whole, so size and mtime identify them.
+    stats = [
+        (path.name, path.stat().st_size, path.stat().st_mtime_ns)
+        for table in TABLES
+        for path in (snapshot / f"{table}.arrow", snapshot / f"{table}.parquet")
+        if path.exists()
+    ]
+    return hashlib.sha256(repr(stats).encode()).hexdigest()[:16]
+
+
+def snowflake_connection(**kwargs: Any) -> Any:
+    """Connect to the live warehouse configured by the SNOWFLAKE_* variables.
+
+    Needs the optional `snowflake-connector-python` package.
+    """
+    try:
+        import snowflake.connector
+    except ImportError:
+        msg = "Connecting to Snowflake needs `pip install snowflake-connector-python`."
+        raise SystemExit(msg) from None
+
+    return snowflake.connector.connect(
+        account=os.environ["SNOWFLAKE_ACCOUNT"],
+        user=os.environ["SNOWFLAKE_USER"],
+        password=os.environ["SNOWFLAKE_PASSWORD"],
+        warehouse=os.environ.get("SNOWFLAKE_WAREHOUSE"),
+        database=os.environ.get("SNOWFLAKE_DATABASE"),
+        schema=os.environ.get("SNOWFLAKE_SCHEMA"),
+        **kwargs,
+    )
+
+
+def write_snapshot(snapshot: str | Path, tables: Mapping[str, pa.Table]) -> None:
+    """Write warehouse tables as memory-mappable Arrow IPC files.
+
+    Indicator rows are written partitioned by year (`partition_by_year`).
+
+    Each file is written aside and renamed over the old one, so tables already
+    memory-mapped from the snapshot stay readable.
+    """
+    snapshot = Path(snapshot)
+    snapshot.mkdir(parents=True, exist_ok=True)
+    for table, data in tables.items():
+        data = _partitioned(table, data)
+        path = snapshot / f"{table}.arrow"
+        partial = path.with_suffix(".arrow.partial")
+        with (
+            pa.OSFile(str(partial), "wb") as sink,
+            pa.ipc.new_file(sink, data.schema) as writer,
+        ):
+            writer.write_table(data)
+        os.replace(partial, path)
+
+
+def partition_by_year(
+    rows: pa.Table, cluster_by: tuple[str, ...] = ("YEAR",)
+) -> pa.Table:
+    """Rows as one record batch per `YEAR`, sorted by `cluster_by` within it.
+
+    Args:
+        rows: table with a `YEAR` column.
+        cluster_by: sort keys, `YEAR` first.
+    """
+    rows = rows.sort_by([(column, "ascending") for column in cluster_by])
+    batches = []
+    offset = 0
+    for count in pc.value_counts(rows.column("YEAR")).field("counts").to_pylist():
+        batches.extend(rows.slice(offset, count).combine_chunks().to_batches())
+        offset += count
+    return pa.Table.from_batches(batches, rows.schema)
+
+
+def _partitioned(table: str, rows: pa.Table) -> pa.Table:
+    cluster_by = models.BASE_CLUSTER_BY.get(table)
+    return rows if cluster_by is None else partition_by_year(rows, cluster_by)
+
+
+def parameterize(
+    query: str, placeholder: str = "${}"
+) -> tuple[str, list[tuple[str, str]]]:
+    """Replace selection links with positional parameters.
+
+    Args:
+        query: query template with `{{widget.0.COLUMN}}` links.
+        placeholder: parameter marker, formatted with its 1-based position.
+
+    Returns:
+        The parameterized query and the `(widget_id, column)` link bound to
+        each parameter, in order.
+    """
+    links: list[tuple[str, str]] = []
+
+    def parameter(match: re.Match[str]) -> str:
+        link = (match.group(1), match.group(2))
+        if link not in links:
+            links.append(link)
+        return placeholder.format(links.index(link) + 1)
+
+    return spec.TEMPLATE_LINK.sub(parameter, query), links
+
+
+def selected(selection: Selection, widget_id: str, column: str) -> Any:
+    """Value of `column` in the row selected on `widget_id`."""
+    try:
+        return selection[widget_id][column]
+    except KeyError:
+        msg = f"No selection for {widget_id}.{column}."
+        raise KeyError(msg) from None
+
+
+def _literal(value: Any) -> str:
+    # `EXECUTE` only takes constant arguments, so values are passed as escaped
+    # literals of their own type rather than spliced into the query text.
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float | Decimal):
+        if not math.isfinite(value):
+            msg = f"Cannot bind the non-finite number {value!r}."
+            raise ValueError(msg)
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        return f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    if isinstance(value, datetime.date):
+        return f"DATE '{value.isoformat()}'"
+    msg = f"Cannot bind a {type(value).__name__} value."
+    raise TypeError(msg)
+
+
+def translate(query: str) -> str:
+    """Rewrite Snowflake-only syntax that DuckDB does not accept."""
+    for pattern, replacement in _DIALECT:
+        query = pattern.sub(replacement, query)
+    return query
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the dashboard's Snowflake widgets against a snapshot."""
+    parser = argparse.ArgumentParser(prog="python -m atlas.warehouse")
+    parser.add_argument("snapshot", type=Path)
+    parser.add_argument("widgets", nargs="*", help="widget names, default all")
+    args = parser.parse_args(argv)
+
+    selection: dict[str, dict[str, Any]] = {}
+    with LocalSnowflake(args.snapshot) as warehouse:
+        for source in spec.load():
+            if source.kind != "snowflake":
+                continue
+            start = time.perf_counter()
+            rows = warehouse.execute(source.template, selection)
+            elapsed = (time.perf_counter() - start) * 1000
+            if rows:
+                selection.setdefault(source.widget_id, rows[0])
+            if args.widgets and source.widget_id not in args.widgets:
+                continue
+            columns = ", ".join(rows[0]) if rows else "-"
+            sys.stdout.write(
+                f"{source.widget_id:<25} {len(rows):>5} rows {elapsed:>8.1f} ms  {columns}\n"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""`atlas.cache.ResultCache` freshness handling."""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from atlas.cache import ResultCache
+
+
+def test_miss_stores_the_token_of_the_fetch_without_reading_freshness() -> None:
+    reads: list[str] = []
+    cache = ResultCache()
+
+    rows = cache.get("key", lambda: ([{"A": 1}], "v1"), lambda: reads.append("x"))
+
+    assert rows == [{"A": 1}]
+    assert reads == []
+    cache.close()
+
+
+def test_stale_entry_is_refetched_only_when_the_token_changed() -> None:
+    now = [0.0]
+    fetches: list[str] = []
+    token = ["v1"]
+
+    def fetch() -> tuple[list[dict[str, int]], str]:
+        fetches.append(token[0])
+        return [{"A": len(fetches)}], token[0]
+
+    cache = ResultCache(ttl=10, clock=lambda: now[0])
+    cache.get("key", fetch, lambda: token[0])
+    now[0] = 20
+    cache.get("key", fetch, lambda: token[0])
+    cache.wait()
+    assert fetches == ["v1"]
+
+    token[0] = "v2"
+    now[0] = 40
+    assert cache.get("key", fetch, lambda: token[0]) == [{"A": 1}]
+    cache.wait()
+    assert fetches == ["v1", "v2"]
+    assert cache.get("key", fetch, lambda: token[0]) == [{"A": 2}]
+    cache.close()
+
+
+def test_concurrent_misses_of_one_key_each_store_a_whole_entry(tmp_path: Path) -> None:
+    caches = [ResultCache(tmp_path) for _ in range(8)]
+    rows = [{"A": index} for index in range(1000)]
+
+    with ThreadPoolExecutor(max_workers=len(caches)) as pool:
+        futures = [
+            pool.submit(cache.get, "key", lambda: (rows, "v1")) for cache in caches
+        ]
+    assert all(future.result() == rows for future in futures)
+
+    assert [path.name for path in tmp_path.iterdir()] == ["key.json"]
+    assert ResultCache(tmp_path).get("key", lambda: ([], None)) == rows
+    for cache in caches:
+        cache.close()
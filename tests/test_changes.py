@@ -0,0 +1,101 @@
+"""`atlas.changes.SnowflakeChangeFeed` polling."""
+
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from atlas import changes
+
+
+class FakeCursor:
+    def __init__(self, connection: "FakeConnection") -> None:
+        self.connection = connection
+
+    def execute(self, statement: str, *args: Any) -> None:
+        if statement.startswith("SELECT") and self.connection.failures:
+            self.connection.failures -= 1
+            raise ConnectionError("session expired")
+        self.connection.statements.append(statement)
+
+    def fetchall(self) -> list[tuple[str, int]]:
+        return [("EN.GHG.CO2.MT.CE.AR5", 2020)]
+
+
+class FakeConnection:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.statements: list[str] = []
+        self.closed = False
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_polling_survives_failed_polls_and_subscribers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    connections = [FakeConnection(failures=1), FakeConnection(failures=0)]
+    monkeypatch.setattr(changes, "snowflake_connection", lambda: connections.pop(0))
+    feed = changes.SnowflakeChangeFeed(interval=0.01)
+    first = feed.connection
+    received: list[changes.Change] = []
+    delivered = threading.Event()
+
+    def failing(change: changes.Change) -> None:
+        raise RuntimeError("subscriber bug")
+
+    def collecting(change: changes.Change) -> None:
+        received.append(change)
+        delivered.set()
+
+    feed.subscribe(failing)
+    feed.subscribe(collecting)
+    assert delivered.wait(5)
+    feed.close()
+
+    assert feed.failed_polls == 1
+    assert feed.failed_callbacks >= 1
+    assert first.closed
+    assert "ROLLBACK" in first.statements
+    assert received[0] == changes.Change(
+        changes.TABLE, frozenset({"EN.GHG.CO2.MT.CE.AR5"}), frozenset({2020})
+    )
+
+
+def test_cancelled_subscribers_are_not_called(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(changes, "snowflake_connection", lambda: FakeConnection(0))
+    feed = changes.SnowflakeChangeFeed(interval=0.01)
+    calls: list[changes.Change] = []
+    cancel = feed.subscribe(calls.append)
+    cancel()
+    second = threading.Event()
+    feed.subscribe(lambda change: second.set())
+    assert second.wait(5)
+    feed.close()
+    assert calls == []
+
+
+def test_polling_stops_once_the_last_subscriber_cancels(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(changes, "snowflake_connection", lambda: FakeConnection(0))
+    feed = changes.SnowflakeChangeFeed(interval=0.01)
+    polled = threading.Event()
+    cancel = feed.subscribe(lambda change: polled.set())
+    assert polled.wait(5)
+    cancel()
+    # The thread may finish the poll it had started.
+    time.sleep(0.1)
+    commits = feed.connection.statements.count("COMMIT")
+    time.sleep(0.1)
+
+    assert feed.connection.statements.count("COMMIT") == commits
+    again = threading.Event()
+    feed.subscribe(lambda change: again.set())
+    assert again.wait(5)
+    feed.close()
@@ -0,0 +1,56 @@
+"""`atlas.fusion.plan` on the dashboard's data sources."""
+
+from atlas import fusion
+from atlas import spec
+
+
+def _requests(tab: str | None) -> list[str]:
+    # Executions loading the widgets shown on `tab`, in layout order.
+    sources = [source for source in spec.load() if source.kind == "snowflake"]
+    fused = fusion.plan(sources)
+    return list(
+        dict.fromkeys(
+            fused[source.widget_id].source.widget_id
+            if source.widget_id in fused
+            else source.widget_id
+            for source in sources
+            if source.tab in (None, tab)
+        )
+    )
+
+
+def test_default_tab_fuses_the_widgets_linked_to_the_overview() -> None:
+    default = next(source.tab for source in spec.load() if source.tab)
+
+    assert _requests(default) == [
+        "year_selector",
+        "general_overview",
+        "gdp_growth+country_vs_region",
+    ]
+
+
+def test_widgets_sharing_a_scan_fuse_whatever_their_links() -> None:
+    requests = {
+        request
+        for tab in {source.tab for source in spec.load()}
+        for request in _requests(tab)
+    }
+
+    assert "gdp_per_capita+gdp_by_country" in requests
+    assert "co2_emissions_trends+co2_emission_by_country" in requests
+
+
+def test_fused_rows_are_read_from_the_row_json_column() -> None:
+    sources = [source for source in spec.load() if source.kind == "snowflake"]
+    query = fusion.plan(sources)["gdp_per_capita"]
+
+    assert f"AS {fusion.ROW_COLUMN}\n" in query.source.template
+    assert fusion.ROW_COLUMN == "ROW_JSON"
+    rows = [
+        {"WIDGET": "gdp_per_capita", "SEQ": 1, "ROW_JSON": '{"value": 1}'},
+        {"WIDGET": "gdp_by_country", "SEQ": 1, "ROW_JSON": '{"VALUE": 2}'},
+    ]
+    assert query.split(rows) == {
+        "gdp_per_capita": [{"VALUE": 1}],
+        "gdp_by_country": [{"VALUE": 2}],
+    }
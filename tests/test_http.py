@@ -0,0 +1,28 @@
+"""`atlas.http` retries and connector clients."""
+
+from unittest import mock
+
+from atlas import http
+
+
+def test_retry_after_is_capped_at_max_backoff() -> None:
+    client = http.HttpClient("http://127.0.0.1:9", max_retries=1, max_backoff=0.25)
+    headers = {"Retry-After": "3600"}
+    responses = [(503, headers, b"busy"), (200, {}, b"[]")]
+    with (
+        mock.patch.object(
+            client, "_HttpClient__request", side_effect=lambda _: responses.pop(0)
+        ),
+        mock.patch.object(http.time, "sleep") as sleep,
+    ):
+        assert client.get("/x") == b"[]"
+    sleep.assert_called_once_with(0.25)
+
+
+def test_new_base_url_closes_the_replaced_client() -> None:
+    first = http.client("test-slug", "http://127.0.0.1:1")
+    with mock.patch.object(first, "close") as close:
+        second = http.client("test-slug", "http://127.0.0.1:2")
+    close.assert_called_once_with()
+    assert second is not first
+    assert http.client("test-slug", "http://127.0.0.1:2/") is second
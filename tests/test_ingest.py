@@ -0,0 +1,129 @@
+"""`atlas.ingest` against the local World Bank API stand-in."""
+
+import asyncio
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pytest
+
+from atlas import fixtures
+from atlas.ingest import INDICATORS_SCHEMA
+from atlas.ingest import SnapshotSink
+from atlas.ingest import ingest
+from atlas.loadgen import WorldBankStandIn
+from atlas.models import INDICATORS
+from atlas.warehouse import LocalSnowflake
+from atlas.warehouse import read_table
+from atlas.warehouse import write_snapshot
+
+GDP_PER_CAPITA = INDICATORS["GDP_PER_CAPITA"]
+
+CO2_EMISSIONS = INDICATORS["CO2_EMISSIONS"]
+
+
+@pytest.fixture(scope="module")
+def source(tmp_path_factory: pytest.TempPathFactory) -> LocalSnowflake:
+    snapshot = tmp_path_factory.mktemp("source")
+    write_snapshot(snapshot, fixtures.snapshot(economy_count=30, seed=7))
+    with LocalSnowflake(snapshot) as warehouse:
+        yield warehouse
+
+
+@pytest.fixture
+def api(source: LocalSnowflake) -> WorldBankStandIn:
+    with WorldBankStandIn(source) as stand_in:
+        yield stand_in
+
+
+def _run(api: WorldBankStandIn, snapshot: Path, state: dict[str, str], **options):
+    sink = SnapshotSink(snapshot)
+    loaded = asyncio.run(ingest(sink, state, base_url=api.base_url, **options))
+    sink.close()
+    return loaded
+
+
+def _rows(table: pa.Table, indicator: str) -> list[tuple]:
+    rows = table.filter(pc.field("INDICATOR_ID") == indicator)
+    return sorted(
+        zip(*(rows[column].to_pylist() for column in ("COUNTRY_CODE", "YEAR", "VALUE")))
+    )
+
+
+def test_pages_are_all_loaded(
+    api: WorldBankStandIn, source: LocalSnowflake, tmp_path: Path
+) -> None:
+    loaded = _run(
+        api, tmp_path, {}, indicators=[GDP_PER_CAPITA], per_page=100, concurrency=4
+    )
+
+    expected = _rows(source.tables["WORLD_BANK_INDICATORS"], GDP_PER_CAPITA)
+    assert loaded == {GDP_PER_CAPITA: len(expected)}
+    assert len(expected) > 100 * 5
+    indicators = read_table(tmp_path, "WORLD_BANK_INDICATORS")
+    assert _rows(indicators, GDP_PER_CAPITA) == expected
+    countries = read_table(tmp_path, "WORLD_BANK_COUNTRIES")
+    assert countries.num_rows == source.tables["WORLD_BANK_COUNTRIES"].num_rows
+
+
+def test_unchanged_indicators_are_skipped(
+    api: WorldBankStandIn, tmp_path: Path
+) -> None:
+    state: dict[str, str] = {}
+    _run(api, tmp_path, state, indicators=[GDP_PER_CAPITA, CO2_EMISSIONS])
+    assert state == {GDP_PER_CAPITA: api.lastupdated, CO2_EMISSIONS: api.lastupdated}
+
+    requests = api.requests
+    assert _run(api, tmp_path, state, indicators=[GDP_PER_CAPITA, CO2_EMISSIONS]) == {}
+    # The country list and one `lastupdated` page per indicator.
+    assert api.requests - requests == 3
+
+    api.lastupdated = "2025-06-30"
+    loaded = _run(api, tmp_path, state, indicators=[GDP_PER_CAPITA])
+    assert list(loaded) == [GDP_PER_CAPITA]
+    assert state[GDP_PER_CAPITA] == "2025-06-30"
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_error_responses_are_retried(
+    api: WorldBankStandIn, source: LocalSnowflake, tmp_path: Path, status: int
+) -> None:
+    api.failures = [status, status]
+
+    loaded = _run(api, tmp_path, {}, indicators=[CO2_EMISSIONS], concurrency=1)
+
+    assert api.failures == []
+    expected = _rows(source.tables["WORLD_BANK_INDICATORS"], CO2_EMISSIONS)
+    assert loaded == {CO2_EMISSIONS: len(expected)}
+
+
+def test_indicator_rows_are_replaced(
+    api: WorldBankStandIn, source: LocalSnowflake, tmp_path: Path
+) -> None:
+    stale = pa.Table.from_pylist(
+        [
+            {
+                "COUNTRY_CODE": "USA",
+                "COUNTRY_NAME": "United States",
+                "INDICATOR_ID": indicator,
+                "YEAR": 1901,
+                "VALUE": -1.0,
+            }
+            for indicator in (GDP_PER_CAPITA, CO2_EMISSIONS)
+        ],
+        schema=INDICATORS_SCHEMA,
+    )
+    write_snapshot(
+        tmp_path,
+        {
+            "WORLD_BANK_INDICATORS": stale,
+            "WORLD_BANK_COUNTRIES": source.tables["WORLD_BANK_COUNTRIES"],
+        },
+    )
+
+    _run(api, tmp_path, {}, indicators=[GDP_PER_CAPITA])
+
+    indicators = read_table(tmp_path, "WORLD_BANK_INDICATORS")
+    expected = _rows(source.tables["WORLD_BANK_INDICATORS"], GDP_PER_CAPITA)
+    assert _rows(indicators, GDP_PER_CAPITA) == expected
+    assert _rows(indicators, CO2_EMISSIONS) == [("USA", 1901, -1.0)]
@@ -0,0 +1,100 @@
+"""`atlas.runtime.Session` loading order."""
+
+import asyncio
+import threading
+from typing import Any
+
+from atlas import spec
+from atlas.runtime import Rows
+from atlas.runtime import Session
+from atlas.warehouse import Selection
+
+SOURCES = [
+    spec.DataSource("year", "fake", "year", "years"),
+    spec.DataSource("shown", "fake", "shown", "{{year.0.YEAR}}", tab="A"),
+    spec.DataSource("hidden", "fake", "hidden", "{{year.0.YEAR}}", tab="B"),
+]
+
+# `chained` links to `shown`, which links to the year selector.
+CHAINED = [
+    *SOURCES[:2],
+    spec.DataSource("chained", "fake", "chained", "{{shown.0.YEAR}}"),
+]
+
+
+class FakeFetcher:
+    """Answers every request with its widget id and selected year.
+
+    A request for a `(widget_id, year)` in `gates` waits for that event.
+    """
+
+    def __init__(self) -> None:
+        self.gates: dict[tuple[str, int], threading.Event] = {}
+
+    def fetch(self, source: spec.DataSource, selection: Selection) -> Rows:
+        if not selection:
+            return [{"YEAR": 2019}, {"YEAR": 2020}]
+        year = next(iter(selection.values()))["YEAR"]
+        gate = self.gates.get((source.widget_id, year))
+        if gate is not None:
+            gate.wait(timeout=5)
+        return [{"WIDGET": source.widget_id, "YEAR": year}]
+
+    def fetch_with_freshness(
+        self, source: spec.DataSource, selection: Selection
+    ) -> tuple[Rows, str | None]:
+        return self.fetch(source, selection), None
+
+    def freshness(self, source: spec.DataSource, selection: Selection) -> str | None:
+        return None
+
+    def invalidate(self, source: spec.DataSource, selection: Selection) -> None:
+        pass
+
+
+def test_select_reloads_hidden_tabs_in_the_background() -> None:
+    async def run() -> tuple[dict[str, Rows], dict[str, Any], dict[str, Rows]]:
+        session = Session({"fake": FakeFetcher()}, SOURCES, fuse=False)
+        await session.show("A")
+        await session.wait()
+        reloaded = await session.select("year", {"YEAR": 2020})
+        pending = dict(session.results)
+        await session.wait()
+        results = dict(session.results)
+        await session.close()
+        return reloaded, pending, results
+
+    reloaded, pending, results = asyncio.run(run())
+
+    assert reloaded == {"shown": [{"WIDGET": "shown", "YEAR": 2020}]}
+    assert "hidden" not in pending
+    assert results["hidden"] == [{"WIDGET": "hidden", "YEAR": 2020}]
+
+
+def test_load_survives_a_selection_made_while_linked_rows_load() -> None:
+    fetcher = FakeFetcher()
+    old = fetcher.gates["shown", 2019] = threading.Event()
+    new = fetcher.gates["shown", 2020] = threading.Event()
+
+    async def started(session: Session, count: int) -> None:
+        while session.fetched.count("shown") < count:
+            await asyncio.sleep(0.001)
+
+    async def run() -> tuple[dict[str, Rows], dict[str, Rows]]:
+        session = Session({"fake": fetcher}, CHAINED, fuse=False)
+        shown = asyncio.create_task(session.show("A"))
+        await started(session, 1)
+        selected = asyncio.create_task(session.select("year", {"YEAR": 2020}))
+        await started(session, 2)
+        # The rows for 2019 are dropped while `chained` waits on them.
+        old.set()
+        await asyncio.sleep(0.05)
+        new.set()
+        results = await asyncio.gather(shown, selected)
+        await session.close()
+        return results
+
+    shown, selected = asyncio.run(run())
+
+    assert shown["chained"] == [{"WIDGET": "chained", "YEAR": 2020}]
+    assert selected["chained"] == [{"WIDGET": "chained", "YEAR": 2020}]
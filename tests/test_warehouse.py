@@ -0,0 +1,33 @@
+"""`atlas.warehouse.LocalSnowflake` binding of selected values."""
+
+import math
+
+import pytest
+
+from atlas import fixtures
+from atlas.warehouse import LocalSnowflake
+from atlas.warehouse import write_snapshot
+
+QUERY = "SELECT {{picked.0.EMPTY}} IS NULL AS EMPTY, {{picked.0.VALUE}} * 2 AS VALUE"
+
+
+@pytest.fixture(scope="module")
+def warehouse(tmp_path_factory: pytest.TempPathFactory) -> LocalSnowflake:
+    snapshot = tmp_path_factory.mktemp("snapshot")
+    write_snapshot(snapshot, fixtures.snapshot(economy_count=5, seed=7))
+    with LocalSnowflake(snapshot) as warehouse:
+        yield warehouse
+
+
+def test_null_and_float_are_bound(warehouse: LocalSnowflake) -> None:
+    rows = warehouse.execute(QUERY, {"picked": {"EMPTY": None, "VALUE": 1.25}})
+
+    assert rows == [{"EMPTY": True, "VALUE": pytest.approx(2.5)}]
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf])
+def test_non_finite_floats_are_rejected(
+    warehouse: LocalSnowflake, value: float
+) -> None:
+    with pytest.raises(ValueError, match="non-finite"):
+        warehouse.execute(QUERY, {"picked": {"EMPTY": None, "VALUE": value}})